@@ -0,0 +1,350 @@
+# Árvore sintática abstrata (AST) usada pelo analisador semântico. É construída
+# uma vez a partir da árvore do ANTLR e guarda só os nós que o analisador trata,
+# com nomes internados, linhas já resolvidas e o texto de que ele precisa, de
+# modo que a árvore do ANTLR e os tokens podem ser liberados depois disso.
+#
+# Cada nó sabe qual método do analisador chamar ao entrar (`entrada`) e ao sair
+# (`saida`) dele; os nós são percorridos na mesma ordem da árvore original, então
+# os erros saem na mesma ordem de antes.
+#
+# A conversão desmonta a árvore do ANTLR: a subárvore de cada declaração global e
+# de cada comando do algoritmo é solta assim que vira AST, para que as duas
+# árvores inteiras não fiquem na memória ao mesmo tempo.
+
+import sys
+from antlr4 import ParserRuleContext, TerminalNode
+from LAGrammarParser import LAGrammarParser
+
+# Formas de expressão, na ordem em que o analisador as testa
+LITERAL = 'literal'
+NUM_INT = 'num_int'
+NUM_REAL = 'num_real'
+IDENT = 'ident'
+IDENTIFICADOR = 'identificador'
+CHAMADA_FUNCAO = 'chamada_funcao'
+CHAMADA_PROCEDIMENTO = 'chamada_procedimento'
+PONTEIRO = 'ponteiro'
+NEGATIVO = 'negativo'
+ENDERECO = 'endereco'
+BINARIA = 'binaria'
+OUTRA = 'outra'
+
+OPERADORES = ('+', '-', '*', '/', '>', '<', '>=', '<=', 'e', 'ou', '<>')
+
+class No:
+    __slots__ = ('filhos',)
+    entrada = None
+    saida = None
+
+    def __init__(self, filhos):
+        self.filhos = filhos  # Nós do AST logo abaixo deste, na ordem do código
+
+class Raiz(No):
+    __slots__ = ()
+
+class DeclLocalGlobal(No):
+    __slots__ = ('linha_fim',)
+    saida = 'exitDecl_local_global'
+
+class Comando(No):
+    # Só os comandos do corpo principal do algoritmo, que descarregam os erros (modo streaming e limite de erros)
+    __slots__ = ('linha_fim',)
+    saida = 'exitComando'
+
+class DeclaracoesVariaveis(No):
+    __slots__ = ('declaracoes',)
+    entrada = 'enterDeclaracoes_variaveis'
+
+class DeclaracaoVariavel(No):
+    __slots__ = ('tipo', 'identificadores')
+    entrada = 'enterDeclaracao_variavel'
+
+class Identificador(No):
+    __slots__ = ('nome', 'linha')
+    entrada = 'enterIdentificador'
+
+class Funcao(No):
+    __slots__ = ('nome', 'linha', 'tipo', 'parametros', 'global_')
+    entrada = 'enterFuncao'
+    saida = 'exitFuncao'
+
+class Procedimento(No):
+    __slots__ = ('nome', 'linha', 'parametros', 'global_')
+    entrada = 'enterProcedimento'
+    saida = 'exitProcedimento'
+
+class ChamadaFuncao(No):
+    __slots__ = ('nome', 'linha', 'argumentos')
+    entrada = 'enterChamada_funcao_cmd'
+
+class ChamadaProcedimento(No):
+    __slots__ = ('nome', 'linha', 'argumentos')
+    entrada = 'enterChamada_procedimento_cmd'
+
+class Constante(No):
+    __slots__ = ('nome', 'linha', 'tipo', 'valor')
+    entrada = 'enterConstante'
+    saida = 'exitConstante'
+
+class DeclaracaoTipoLista(No):
+    __slots__ = ('nome', 'linha', 'campos')
+    entrada = 'enterDeclaracao_tipo_lista'
+
+class Retorno(No):
+    __slots__ = ('linha',)
+    entrada = 'enterRetorno'
+
+class Atribuicao(No):
+    __slots__ = ('identificador', 'expressao', 'linha', 'texto')
+    saida = 'exitAtribuicao_cmd'
+
+class Expressao:
+    # Não é percorrida: os nós com eventos dentro dela ficam nos filhos do nó que a contém
+    __slots__ = ('forma', 'valor', 'linha', 'operandos', 'texto')
+
+    def __init__(self, forma, linha, valor=None, operandos=()):
+        self.forma = forma
+        self.linha = linha
+        self.valor = valor  # Nome ou texto usado para tipar a expressão
+        self.operandos = operandos  # Subexpressões (Expressao ou None, como no ANTLR)
+        self.texto = None  # Texto completo, só nas expressões atribuídas
+
+class NoTipo:
+    # Tipo escrito no código; `alvo` é o tipo apontado de um ponteiro
+    __slots__ = ('nome', 'ident', 'alvo')
+
+    def __init__(self, nome=None, ident=False, alvo=None):
+        self.nome = nome
+        self.ident = ident  # True se for o nome de um tipo declarado pelo usuário
+        self.alvo = alvo
+
+class Percurso:
+    # Percorre o AST chamando, no analisador, os métodos de entrada e saída de cada nó
+    def percorre(self, analyzer, no):
+        if no.entrada is not None:
+            getattr(analyzer, no.entrada)(no)
+        for filho in no.filhos:
+            self.percorre(analyzer, filho)
+        if no.saida is not None:
+            getattr(analyzer, no.saida)(no)
+
+VAZIO = ()
+
+class Rebaixador:
+    # Constrói o AST a partir de uma árvore do ANTLR. Cada regra com um método de
+    # mesmo nome aqui vira um nó; as demais só repassam os nós de seus filhos.
+    def __init__(self, texto):
+        self.texto = texto  # TextoNos da árvore
+        self.nos = {}  # Contexto -> nó já construído (identificadores e expressões)
+        self.tipos = {}  # NoTipo já construídos, compartilhados entre as declarações
+
+    def baixa(self, arvore):
+        # Percorre a árvore em pós-ordem sem recursão; `abaixo` guarda os nós do AST
+        # de cada subárvore já processada até que o pai os recolha
+        abaixo = {}
+        pilha = [(arvore, False)]
+        while pilha:
+            ctx, visitado = pilha.pop()
+            if not visitado:
+                pilha.append((ctx, True))
+                for filho in reversed(ctx.children or VAZIO):
+                    if isinstance(filho, ParserRuleContext):
+                        pilha.append((filho, False))
+                continue
+            filhos = []
+            for filho in ctx.children or VAZIO:
+                nos = abaixo.pop(filho, None)
+                if nos:
+                    filhos.extend(nos)
+            filhos = tuple(filhos) if filhos else VAZIO
+            construtor = getattr(self, LAGrammarParser.ruleNames[ctx.getRuleIndex()], None)
+            abaixo[ctx] = construtor(ctx, filhos) if construtor is not None else filhos
+        self.nos = {}
+        return Raiz(abaixo[arvore])
+
+    def nome(self, ctx):
+        return sys.intern(self.texto(ctx))
+
+    def texto_curto(self, ctx):
+        # Texto de um filho comparado com um operador: com os tokens disponíveis, um
+        # nó de três ou mais tokens não pode ser operador e o texto nem é montado
+        if (not isinstance(ctx, TerminalNode) and self.texto.tokens is not None and ctx.stop is not None
+                and ctx.stop.tokenIndex - ctx.start.tokenIndex >= 2):
+            return None
+        return self.texto(ctx)
+
+    def solta(self, ctx):
+        # Libera a subárvore do ANTLR de uma unidade já convertida
+        ctx.children = None
+        self.nos.clear()
+        self.texto.cache.clear()
+
+    def tipo_escrito(self, ctx):
+        if ctx is None:
+            return None
+        if ctx.tipo() is not None:
+            return NoTipo(alvo=self.tipo_escrito(ctx.tipo()))
+        if ctx.IDENT() is not None:
+            chave = (ctx.IDENT().getText(), True)
+        else:
+            chave = (ctx.getChild(0).getText() if ctx.children else None, False)
+        no = self.tipos.get(chave)
+        if no is None:
+            no = self.tipos[chave] = NoTipo(*chave)
+        return no
+
+    def lista_parametros(self, ctx):
+        parametros = ctx.parametros().parametro() if ctx.parametros() else []
+        return tuple((self.nome(param.identificador()), self.tipo_escrito(param.tipo())) for param in parametros)
+
+    def lista_argumentos(self, ctx):
+        return tuple(self.nos.get(arg) for arg in ctx.argumentos().expressao()) if ctx.argumentos() else VAZIO
+
+    def linha_fim(self, ctx):
+        # Uma regra que não consumiu nenhum token (erro de sintaxe logo no início,
+        # como em 'declare 1') fica sem stop; a linha do start serve de fim
+        return ctx.stop.line if ctx.stop is not None else ctx.start.line
+
+    def decl_local_global(self, ctx, filhos):
+        no = DeclLocalGlobal(filhos)
+        no.linha_fim = self.linha_fim(ctx)
+        self.solta(ctx)
+        return (no,)
+
+    def comando(self, ctx, filhos):
+        corpo = ctx.parentCtx.parentCtx
+        if not isinstance(corpo.parentCtx, LAGrammarParser.ProgramaContext):
+            return filhos
+        no = Comando(filhos)
+        no.linha_fim = self.linha_fim(ctx)
+        self.solta(ctx)
+        return (no,)
+
+    def declaracoes_variaveis(self, ctx, filhos):
+        no = DeclaracoesVariaveis(filhos)
+        no.declaracoes = tuple(self.nos[decl] for decl in ctx.declaracao_variavel())
+        return (no,)
+
+    def declaracao_variavel(self, ctx, filhos):
+        no = self.nos[ctx] = DeclaracaoVariavel(filhos)
+        no.tipo = self.tipo_escrito(ctx.tipo())
+        identificadores = ctx.identificadores()
+        no.identificadores = tuple(self.nos[i] for i in identificadores.identificador()) if identificadores else None
+        return (no,)
+
+    def identificador(self, ctx, filhos):
+        no = self.nos[ctx] = Identificador(filhos)
+        no.nome = self.nome(ctx)
+        no.linha = ctx.start.line
+        return (no,)
+
+    def funcao(self, ctx, filhos):
+        no = Funcao(filhos)
+        no.nome = sys.intern(ctx.IDENT().getText())
+        no.linha = ctx.start.line
+        no.tipo = self.tipo_escrito(ctx.tipo())
+        no.parametros = self.lista_parametros(ctx)
+        no.global_ = isinstance(ctx.parentCtx, LAGrammarParser.Declaracao_globalContext)
+        return (no,)
+
+    def procedimento(self, ctx, filhos):
+        no = Procedimento(filhos)
+        no.nome = sys.intern(ctx.IDENT().getText())
+        no.linha = ctx.start.line
+        no.parametros = self.lista_parametros(ctx)
+        no.global_ = isinstance(ctx.parentCtx, LAGrammarParser.Declaracao_globalContext)
+        return (no,)
+
+    def chamada_funcao_cmd(self, ctx, filhos):
+        no = ChamadaFuncao(filhos)
+        no.nome = self.nome(ctx.identificador())
+        no.linha = ctx.start.line
+        no.argumentos = self.lista_argumentos(ctx)
+        return (no,)
+
+    def chamada_procedimento_cmd(self, ctx, filhos):
+        no = ChamadaProcedimento(filhos)
+        no.nome = self.nome(ctx.identificador())
+        no.linha = ctx.start.line
+        no.argumentos = self.lista_argumentos(ctx)
+        return (no,)
+
+    def constante(self, ctx, filhos):
+        no = Constante(filhos)
+        no.nome = sys.intern(ctx.IDENT().getText())
+        no.linha = ctx.start.line
+        no.tipo = self.tipo_escrito(ctx.tipo())
+        no.valor = self.texto(ctx.expressao())
+        return (no,)
+
+    def declaracao_tipo_lista(self, ctx, filhos):
+        no = DeclaracaoTipoLista(filhos)
+        no.nome = sys.intern(ctx.IDENT().getText())
+        no.linha = ctx.start.line
+        # (tipo, nomes) de cada linha de campos do registro
+        no.campos = tuple((self.tipo_escrito(campo.tipo()), tuple(self.texto(i) for i in campo.identificadores().identificador()))
+                          for campo in ctx.registro().campos_registro().campo_registro())
+        return (no,)
+
+    def retorno(self, ctx, filhos):
+        no = Retorno(filhos)
+        no.linha = ctx.start.line
+        return (no,)
+
+    def atribuicao_cmd(self, ctx, filhos):
+        no = Atribuicao(filhos)
+        no.identificador = self.nos.get(ctx.identificador())
+        no.expressao = self.nos.get(ctx.expressao())
+        if no.expressao is not None:
+            no.expressao.texto = self.texto(ctx.expressao())
+        no.linha = ctx.start.line
+        # Sem identificador (atribuição a um ponteiro), o texto vai na mensagem de erro
+        no.texto = self.texto(ctx) if ctx.identificador() is None else None
+        return (no,)
+
+    def expressao(self, ctx, filhos):
+        # Uma única passada pelos filhos guarda o primeiro de cada regra e de cada tipo
+        # de token; as formas são testadas na mesma ordem em que o analisador testava
+        primeiro = {}
+        operandos = []
+        for filho in ctx.children or VAZIO:
+            if isinstance(filho, TerminalNode):
+                primeiro.setdefault(filho.symbol.type, filho)
+            elif isinstance(filho, LAGrammarParser.ExpressaoContext):
+                operandos.append(self.nos.get(filho))
+            else:
+                primeiro.setdefault(type(filho), filho)
+        operandos += [None, None]
+
+        linha = ctx.start.line
+        if LAGrammarParser.LiteralContext in primeiro:
+            no = Expressao(LITERAL, linha, self.nome(primeiro[LAGrammarParser.LiteralContext]))
+        elif LAGrammarParser.NUM_INT in primeiro:
+            no = Expressao(NUM_INT, linha)
+        elif LAGrammarParser.NUM_REAL in primeiro:
+            no = Expressao(NUM_REAL, linha)
+        elif LAGrammarParser.IDENT in primeiro:
+            no = Expressao(IDENT, linha, sys.intern(primeiro[LAGrammarParser.IDENT].getText()))
+        elif LAGrammarParser.IdentificadorContext in primeiro:
+            no = Expressao(IDENTIFICADOR, linha, self.nome(primeiro[LAGrammarParser.IdentificadorContext]))
+        elif LAGrammarParser.Chamada_funcao_cmdContext in primeiro:
+            chamada = primeiro[LAGrammarParser.Chamada_funcao_cmdContext]
+            no = Expressao(CHAMADA_FUNCAO, linha, self.nome(chamada.identificador()))
+        elif LAGrammarParser.Chamada_procedimento_cmdContext in primeiro:
+            chamada = primeiro[LAGrammarParser.Chamada_procedimento_cmdContext]
+            no = Expressao(CHAMADA_PROCEDIMENTO, linha, self.nome(chamada.identificador()))
+        elif LAGrammarParser.PonteiroContext in primeiro:
+            no = Expressao(PONTEIRO, linha)
+        elif ctx.children and self.texto_curto(ctx.children[0]) == '-':
+            no = Expressao(NEGATIVO, linha, operandos=(operandos[0],))
+        elif LAGrammarParser.EnderecoContext in primeiro:
+            no = Expressao(ENDERECO, linha)
+        elif ctx.children and len(ctx.children) > 1 and self.texto_curto(ctx.children[1]) in OPERADORES:
+            no = Expressao(BINARIA, linha, operandos=(operandos[0], operandos[1]))
+        else:
+            no = Expressao(OUTRA, linha)
+        self.nos[ctx] = no
+        return filhos
+
+def baixa(arvore, texto):
+    return Rebaixador(texto).baixa(arvore)
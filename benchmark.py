@@ -0,0 +1,279 @@
+# Gerador de programas LA sintéticos e medição de lex, parse, ast, walk e memória de pico
+# do analisador, comparando com uma baseline guardada. Também mede o tempo do lexer de
+# expressão regular (lexico.py) e do LAGrammarLexer; que os dois geram os mesmos
+# tokens é conferido em tests/test_lexico.py
+
+import argparse
+import json
+import multiprocessing
+import os
+import queue
+import random
+import resource
+import sys
+import tempfile
+import time
+
+from antlr4 import InputStream, Token
+from LAGrammarLexer import LAGrammarLexer
+import main as analisador
+from lexico import LexerRapido
+
+BASELINE = "benchmark_baseline.json"
+
+# Diferenças menores que isto (em segundos) são ruído de medição e não contam como regressão
+TOLERANCIA = 0.01
+
+# Tempo máximo (em segundos) de uma execução do analisador num caso
+TEMPO_LIMITE = 600
+
+# Programas gerados para cada tamanho: válido, com erros, e com expressões longas e
+# muito aninhadas, em que a conversão para o AST e o walk dependem de montar o texto
+# de cada nó uma única vez (TextoNos) e de tipar cada expressão uma única vez
+CASOS = {
+    'valido': {},
+    'quebrado': {'quebrado': True},
+    'expressoes': {'profundidade': 10, 'argumentos': 60},
+}
+
+class GeradorLA:
+    def __init__(self, seed=0, quebrado=False, subprogramas=False, profundidade=6, argumentos=20):
+        self.rand = random.Random(seed)
+        self.quebrado = quebrado  # Mistura erros semânticos e de sintaxe no programa
+        # funcao/procedimento usam '{' corpo '}', que o lexer da gramática lê como
+        # comentário; por isso só entram no programa quando pedidos explicitamente
+        self.subprogramas = subprogramas
+        self.profundidade = profundidade  # Aninhamento máximo das expressões
+        self.argumentos = argumentos  # Quantidade de argumentos dos escreva longos
+        self.inteiros = []
+        self.reais = []
+        self.registros = []  # Variáveis de tipo registro
+
+    def expressao(self, profundidade):
+        if profundidade <= 0 or self.rand.random() < 0.2:
+            if self.rand.random() < 0.3:
+                return str(self.rand.randint(0, 999))
+            return self.rand.choice(self.inteiros)
+        op = self.rand.choice(['+', '-', '*', '/'])
+        esquerda = self.expressao(profundidade - 1)
+        direita = self.expressao(profundidade - 1)
+        if self.rand.random() < 0.5:
+            return f"({esquerda} {op} {direita})"
+        return f"{esquerda} {op} {direita}"
+
+    def declaracoes(self, quantidade):
+        linhas = []
+        for i in range(quantidade):
+            escolha = self.rand.random()
+            if escolha < 0.1:
+                linhas += [f"tipo ponto{i}: registro", "  x: real", "  y: real", "fim_registro",
+                           f"declare reg{i}: ponto{i}"]
+                self.registros.append(f"reg{i}")
+            elif escolha < 0.15:
+                linhas.append(f"declare ptr{i}: ^inteiro")
+            elif escolha < 0.2:
+                linhas.append(f"constante C{i}: inteiro = {self.rand.randint(0, 99)}")
+            elif escolha < 0.3:
+                linhas.append(f"declare r{i}: real")
+                self.reais.append(f"r{i}")
+            elif self.subprogramas and escolha < 0.4:
+                linhas += [f"funcao f{i}(a: inteiro, b: real): inteiro", "{",
+                           "  retorne a + 1", "}", "fim_funcao",
+                           f"procedimento p{i}(a: inteiro)", "{", "  escreva(a)", "}", "fim_procedimento"]
+            else:
+                linhas.append(f"declare v{i}: inteiro")
+                self.inteiros.append(f"v{i}")
+            if self.quebrado and self.rand.random() < 0.05:
+                linhas.append(f"declare v{i}: real")  # Redeclaração
+        return linhas
+
+    def comando(self, nivel):
+        escolha = self.rand.random()
+        destino = self.rand.choice(self.inteiros)
+        if self.quebrado and escolha < 0.05:
+            return [f"naodeclarado{self.rand.randint(0, 99)} <- {self.expressao(2)}"]
+        if self.quebrado and escolha < 0.08 and self.registros:
+            return [f"{self.rand.choice(self.registros)}.z <- 1"]  # Campo inexistente
+        if self.quebrado and escolha < 0.09:
+            return [f"{destino} <- ({self.expressao(2)}"]  # Erro de sintaxe
+        if escolha < 0.4:
+            return [f"{destino} <- {self.expressao(self.profundidade)}"]
+        if escolha < 0.5:
+            argumentos = ['"texto"'] + [self.expressao(2) for _ in range(self.argumentos)]
+            return [f"escreva({', '.join(argumentos)})"]
+        if escolha < 0.6 and self.registros:
+            return [f"{self.rand.choice(self.registros)}.x <- 1.5"]
+        if escolha < 0.65 and self.reais:
+            return [f"{self.rand.choice(self.reais)} <- {destino} * 2"]
+        if escolha < 0.7:
+            return [f"leia({destino})"]
+        if nivel < 3 and escolha < 0.8:
+            return ([f"se {destino} > {self.expressao(2)} entao"] + self.comando(nivel + 1) +
+                    ["senao"] + self.comando(nivel + 1) + ["fim_se"])
+        if nivel < 3 and escolha < 0.9:
+            return ([f"enquanto {destino} < {self.rand.randint(1, 99)} faca"] + self.comando(nivel + 1) +
+                    ["fim_enquanto"])
+        if nivel < 3:
+            return ([f"para {destino} <- 1 ate {self.rand.randint(1, 99)} faca"] + self.comando(nivel + 1) +
+                    ["fim_para"])
+        return [f"{destino} <- {destino} + 1"]
+
+    def programa(self, linhas):
+        # Cerca de um terço das linhas são declarações e o restante é o corpo do algoritmo
+        codigo = self.declaracoes(max(1, linhas // 3))
+        if not self.inteiros:
+            codigo.append("declare v: inteiro")
+            self.inteiros.append("v")
+        codigo.append("algoritmo")
+        while len(codigo) < linhas - 1:
+            codigo += ["  " + linha for linha in self.comando(0)]
+        codigo.append("fim_algoritmo")
+        return "\n".join(codigo) + "\n"
+
+def executa_caso(entrada, saida, opcoes, fila):
+    # Roda num processo separado, criado com 'spawn', para que o pico de memória seja
+    # só da análise deste caso, sem o gerador e os casos anteriores
+    estatisticas = analisador.main(entrada, saida, modo_rapido=opcoes['sll'],
+                                   memoria_limitada=opcoes['memoria_limitada'],
+                                   lexer_rapido=opcoes['lexer_rapido'])
+    # ru_maxrss é em KB no Linux
+    estatisticas['memoria_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    fila.put(estatisticas)
+
+def espera_resultado(processo, fila):
+    # Retorna as estatísticas do processo, ou None se ele terminar sem mandá-las
+    # (uma exceção na análise, por exemplo) ou passar de TEMPO_LIMITE
+    limite = time.monotonic() + TEMPO_LIMITE
+    while time.monotonic() < limite:
+        vivo = processo.is_alive()
+        try:
+            return fila.get(timeout=1)
+        except queue.Empty:
+            if not vivo:
+                return None
+    processo.terminate()
+    return None
+
+def mede(linhas, caso, opcoes, repeticoes):
+    # Fica com o menor valor de cada métrica entre as repetições, o menos afetado por ruído
+    contexto = multiprocessing.get_context('spawn')
+    resultado = {}
+    with tempfile.TemporaryDirectory() as diretorio:
+        entrada = os.path.join(diretorio, "entrada.txt")
+        with open(entrada, "w") as f:
+            f.write(GeradorLA(seed=linhas, subprogramas=opcoes['subprogramas'],
+                              **CASOS[caso]).programa(linhas))
+        for _ in range(repeticoes):
+            fila = contexto.Queue()
+            processo = contexto.Process(target=executa_caso,
+                                        args=(entrada, os.path.join(diretorio, "saida.txt"), opcoes, fila))
+            processo.start()
+            medidas = espera_resultado(processo, fila)
+            processo.join()
+            if medidas is None:
+                raise RuntimeError(f"{linhas}_{caso}: a análise terminou "
+                                   f"sem resultado (exitcode {processo.exitcode})")
+            for metrica in ('lex', 'parse', 'ast', 'walk', 'memoria_kb'):
+                resultado[metrica] = min(resultado.get(metrica, medidas[metrica]), medidas[metrica])
+    return resultado
+
+def compara(resultados, baseline, limiar):
+    # Retorna as métricas que pioraram mais que `limiar` (fração) em relação à baseline
+    regressoes = []
+    for caso, medidas in resultados.items():
+        for metrica in ('lex', 'parse', 'ast', 'walk', 'memoria_kb'):
+            anterior = baseline.get(caso, {}).get(metrica)
+            if anterior and medidas[metrica] > anterior * (1 + limiar) and (
+                    metrica == 'memoria_kb' or medidas[metrica] - anterior > TOLERANCIA):
+                regressoes.append(f"{caso} {metrica}: {anterior:.3f} -> {medidas[metrica]:.3f}")
+    return regressoes
+
+def conta_tokens(lexer):
+    # Consome todos os tokens do lexer, até o EOF inclusive
+    quantidade = 1
+    while lexer.nextToken().type != Token.EOF:
+        quantidade += 1
+    return quantidade
+
+def mede_lexers(tamanhos, repeticoes, subprogramas):
+    # Mostra o tempo dos dois lexers em cada programa gerado; vale o menor entre as repetições
+    for linhas in tamanhos:
+        for caso, parametros in CASOS.items():
+            nome = f"{linhas}_{caso}"
+            texto = GeradorLA(seed=linhas, subprogramas=subprogramas, **parametros).programa(linhas)
+            tempos = {}
+            for rotulo, cria in (('antlr', lambda: LAGrammarLexer(InputStream(texto))), ('regex', lambda: LexerRapido(texto))):
+                for _ in range(repeticoes):
+                    inicio = time.perf_counter()
+                    quantidade = conta_tokens(cria())
+                    tempo = time.perf_counter() - inicio
+                    tempos[rotulo] = min(tempos.get(rotulo, tempo), tempo)
+            print(f"{nome:>20}: {quantidade} tokens, ANTLR {tempos['antlr']:.3f}s, "
+                  f"regex {tempos['regex']:.3f}s ({tempos['antlr'] / tempos['regex']:.1f}x)")
+
+def main():
+    parser = argparse.ArgumentParser(description="Benchmark do analisador com programas LA sintéticos")
+    parser.add_argument("--linhas", type=int, nargs="+", default=[100, 1000],
+                        help="tamanhos dos programas gerados (padrão: 100 1000)")
+    parser.add_argument("--repeticoes", type=int, default=3,
+                        help="execuções de cada caso; vale o menor valor (padrão: 3)")
+    parser.add_argument("--sll", action="store_true",
+                        help="usa a análise sintática em dois estágios SLL/LL")
+    parser.add_argument("--memoria-limitada", action="store_true",
+                        help="analisa uma declaração global por vez (main.py --memoria-limitada)")
+    parser.add_argument("--lexer-rapido", action="store_true",
+                        help="gera os tokens com o lexer de expressão regular (lexico.py)")
+    parser.add_argument("--tempo-lexers", action="store_true",
+                        help="só mede o tempo do lexer de expressão regular e do LAGrammarLexer")
+    parser.add_argument("--subprogramas", action="store_true",
+                        help="inclui funcao/procedimento nos programas gerados")
+    parser.add_argument("--baseline", default=BASELINE,
+                        help="arquivo JSON com a baseline (padrão: %(default)s)")
+    parser.add_argument("--salvar-baseline", action="store_true",
+                        help="grava os resultados desta execução como nova baseline")
+    parser.add_argument("--limiar", type=float, default=0.2,
+                        help="piora máxima aceita em relação à baseline (padrão: 0.2 = 20%%)")
+    parser.add_argument("--gerar", metavar="ARQUIVO",
+                        help="só grava em ARQUIVO um programa com o primeiro tamanho de --linhas")
+    parser.add_argument("--caso", choices=list(CASOS), default='valido',
+                        help="com --gerar, o tipo de programa gerado (padrão: %(default)s)")
+    parser.add_argument("--quebrado", action="store_const", dest="caso", const='quebrado',
+                        help="com --gerar, gera um programa com erros (o mesmo que --caso quebrado)")
+    args = parser.parse_args()
+
+    if args.gerar:
+        with open(args.gerar, "w") as f:
+            f.write(GeradorLA(seed=args.linhas[0], subprogramas=args.subprogramas,
+                              **CASOS[args.caso]).programa(args.linhas[0]))
+        return
+
+    if args.tempo_lexers:
+        mede_lexers(args.linhas, args.repeticoes, args.subprogramas)
+        return
+
+    opcoes = {'sll': args.sll, 'subprogramas': args.subprogramas, 'memoria_limitada': args.memoria_limitada,
+              'lexer_rapido': args.lexer_rapido}
+    resultados = {}
+    for linhas in args.linhas:
+        for caso in CASOS:
+            nome = f"{linhas}_{caso}"
+            medidas = resultados[nome] = mede(linhas, caso, opcoes, args.repeticoes)
+            print(f"{nome:>20}: lex {medidas['lex']:.3f}s, parse {medidas['parse']:.3f}s, "
+                  f"ast {medidas['ast']:.3f}s, walk {medidas['walk']:.3f}s, memória {medidas['memoria_kb'] / 1024:.1f} MB")
+
+    if args.salvar_baseline:
+        with open(args.baseline, "w") as f:
+            json.dump(resultados, f, indent=2)
+        return
+
+    if os.path.exists(args.baseline):
+        with open(args.baseline) as f:
+            regressoes = compara(resultados, json.load(f), args.limiar)
+        if regressoes:
+            print("Regressões em relação à baseline:")
+            for regressao in regressoes:
+                print("  " + regressao)
+            sys.exit(1)
+
+if __name__ == "__main__":
+    main()
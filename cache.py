@@ -0,0 +1,120 @@
+# Cache em disco dos resultados do analisador, endereçado pelo conteúdo: a chave é
+# o hash do código-fonte, da gramática e do próprio analisador, então qualquer
+# mudança em um deles gera uma chave nova e entradas antigas só saem por LRU
+
+import contextlib
+import fcntl
+import hashlib
+import os
+import tempfile
+
+DIRETORIO = os.path.dirname(os.path.abspath(__file__))
+
+# Arquivos cuja mudança altera o resultado da análise
+ARQUIVOS_ANALISADOR = ['LAGrammar.g4', 'arvore.py', 'lexico.py', 'main.py', 'memoria.py', 'paralelo.py', 'tabela_simbolos.py', 'tipos.py']
+
+LIMITE_PADRAO = 256 * 1024 * 1024  # bytes
+
+# Percorrer o diretório a cada gravação custaria O(entradas); a limpeza roda na
+# primeira gravação no cache e depois a cada LIMPEZA_A_CADA gravações. A contagem
+# fica no arquivo .lock, e não na memória, porque cada execução do main.py pela
+# linha de comando é um processo novo que grava uma única vez
+LIMPEZA_A_CADA = 32
+
+_versao = None
+
+def versao_analisador():
+    # Hash da gramática e do código do analisador, calculado uma vez por processo
+    global _versao
+    if _versao is None:
+        h = hashlib.sha256()
+        for nome in ARQUIVOS_ANALISADOR:
+            with open(os.path.join(DIRETORIO, nome), 'rb') as f:
+                h.update(f.read())
+        _versao = h.hexdigest()
+    return _versao
+
+class CacheResultados:
+    def __init__(self, diretorio, limite=LIMITE_PADRAO):
+        self.diretorio = diretorio
+        self.limite = limite
+        os.makedirs(diretorio, exist_ok=True)
+
+    def chave(self, codigo, *opcoes):
+        # `opcoes` são as opções que mudam a saída (por exemplo, o limite de erros)
+        h = hashlib.sha256(versao_analisador().encode())
+        h.update(repr(opcoes).encode())
+        h.update(codigo)
+        return h.hexdigest()
+
+    def caminho(self, chave):
+        return os.path.join(self.diretorio, chave + '.txt')
+
+    def busca(self, chave):
+        caminho = self.caminho(chave)
+        try:
+            with open(caminho, 'rb') as f:
+                conteudo = f.read()
+            os.utime(caminho)  # Marca como usado recentemente para o LRU
+        except FileNotFoundError:
+            return None  # Também acontece se outro processo acabou de remover a entrada
+        return conteudo
+
+    def grava(self, chave, conteudo):
+        # Grava num arquivo temporário e renomeia, para que outro processo nunca
+        # leia uma entrada pela metade
+        fd, temporario = tempfile.mkstemp(dir=self.diretorio, suffix='.tmp')
+        with os.fdopen(fd, 'wb') as f:
+            f.write(conteudo)
+        os.replace(temporario, self.caminho(chave))
+
+        with self.trava() as lock:
+            try:
+                gravacoes = int(lock.read() or 0)
+            except ValueError:
+                gravacoes = 0  # Contagem ilegível: recomeça, limpando agora
+            lock.seek(0)
+            lock.truncate()
+            lock.write(str(gravacoes + 1))
+            lock.flush()
+            if gravacoes % LIMPEZA_A_CADA == 0:
+                self.limpa()
+
+    @contextlib.contextmanager
+    def trava(self):
+        # Lock exclusivo entre processos sobre o .lock, que guarda o número de gravações.
+        # Evita que vários processos façam a limpeza ao mesmo tempo ou percam contagens.
+        fd = os.open(os.path.join(self.diretorio, '.lock'), os.O_RDWR | os.O_CREAT, 0o666)
+        with os.fdopen(fd, 'r+') as lock:
+            fcntl.flock(lock, fcntl.LOCK_EX)
+            yield lock
+
+    def remove_antigos(self):
+        with self.trava():
+            self.limpa()
+
+    def limpa(self):
+        # Remove as entradas usadas há mais tempo até o cache caber no limite; só
+        # é chamada com a trava() obtida
+        entradas = []
+        total = 0
+        for entrada in os.scandir(self.diretorio):
+            if not entrada.name.endswith('.txt'):
+                continue
+            try:
+                info = entrada.stat()
+            except FileNotFoundError:
+                continue
+            entradas.append((info.st_mtime, info.st_size, entrada.path))
+            total += info.st_size
+        if total <= self.limite:
+            return
+        entradas.sort()
+        for _, tamanho, caminho in entradas:
+            if total <= self.limite:
+                break
+            try:
+                os.remove(caminho)
+            except FileNotFoundError:
+                pass
+            total -= tamanho
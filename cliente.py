@@ -0,0 +1,48 @@
+# Cliente do servidor de análise (servidor.py). Usa só a biblioteca padrão, para
+# que o main.py possa consultá-lo antes de importar o ANTLR.
+
+import json
+import os
+import socket
+import sys
+import tempfile
+
+from cache import versao_analisador
+
+# Limites de espera (em segundos): um socket sem servidor por trás ou um servidor
+# travado não podem prender o main.py, que nesses casos analisa no próprio processo
+TEMPO_CONEXAO = 1
+TEMPO_RESPOSTA = 120
+
+def socket_padrao():
+    return os.environ.get('LA_SERVIDOR_SOCKET') or os.path.join(
+        tempfile.gettempdir(), f'la-analisador-{os.getuid()}.sock')
+
+def analisa_no_servidor(argv, caminho=None):
+    # Envia os argumentos da linha de comando ao servidor. Retorna True se ele fez a
+    # análise, ou False se não há servidor, ele está com outra versão do analisador
+    # ou a análise falhou lá ou demorou mais que TEMPO_RESPOSTA, casos em que o
+    # main.py analisa no próprio processo
+    if '--sem-servidor' in argv:
+        return False
+    # O pico de memória relatado por --memoria-limitada seria o do servidor, não o desta análise
+    if '--memoria-limitada' in argv:
+        return False
+    pedido = {'argv': argv, 'cwd': os.getcwd(), 'versao': versao_analisador()}
+    try:
+        with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as conexao:
+            conexao.settimeout(TEMPO_CONEXAO)
+            conexao.connect(caminho or socket_padrao())
+            conexao.settimeout(TEMPO_RESPOSTA)
+            conexao.sendall((json.dumps(pedido) + '\n').encode())
+            with conexao.makefile('rb') as f:
+                linha = f.readline()
+    except OSError:  # Inclui o socket.timeout
+        return False
+    if not linha:
+        return False
+    resposta = json.loads(linha)
+    if not resposta['ok']:
+        return False
+    sys.stdout.write(resposta['stdout'])
+    return True
@@ -0,0 +1,105 @@
+# Lexer alternativo ao LAGrammarLexer gerado pelo ANTLR (--lexer-rapido). Em vez de
+# simular o ATN do lexer um caractere por vez, usa uma única expressão regular com
+# uma alternativa por regra da gramática. Gera os mesmos tokens, com os mesmos
+# tipos, textos, posições, linhas e colunas, e o LAGrammarParser os aceita sem
+# nenhuma mudança; o tests/test_lexico.py confere isso token a token.
+#
+# O lexer do ANTLR fica com o casamento mais longo e, no empate, com a regra que
+# vem primeiro (as palavras-chave, que são tokens implícitos, antes de IDENT).
+# A expressão regular reproduz isso assim:
+#   - palavras casam inteiras como IDENT e só então viram palavra-chave, se forem uma;
+#   - 'verdadeiro' e 'falso' saem como IDENT, porque IDENT vem antes de LOGICO na
+#     gramática e casa o mesmo texto (e por isso LOGICO nunca é gerado);
+#   - NUM_REAL é tentado antes de NUM_INT e os símbolos mais longos antes dos curtos;
+#   - COMMENTS só casa com o '}' de fechamento; sem ele, '{' é um token comum;
+#   - qualquer outro caractere vira ErrorChar.
+
+import re
+from antlr4 import Token
+from antlr4.CommonTokenFactory import CommonTokenFactory
+from antlr4.Token import CommonToken
+from LAGrammarLexer import LAGrammarLexer
+
+_PALAVRA = r'[a-zA-Z][a-zA-Z0-9_]*'
+
+def _literais():
+    # Tokens de texto fixo da gramática, separados em palavras-chave e símbolos
+    palavras = {}
+    simbolos = {}
+    for tipo, nome in enumerate(LAGrammarLexer.literalNames):
+        if len(nome) < 3 or not (nome.startswith("'") and nome.endswith("'")):
+            continue
+        texto = nome[1:-1]
+        if re.fullmatch(_PALAVRA, texto):
+            palavras[texto] = tipo
+        else:
+            simbolos[texto] = tipo
+    return palavras, simbolos
+
+PALAVRAS, SIMBOLOS = _literais()
+
+# Uma alternativa por regra; como o ErrorChar casa qualquer caractere, a expressão
+# casa em todas as posições e os casamentos do finditer são contíguos
+MESTRE = re.compile('|'.join([
+    r'(?P<COMMENTS>\{[^}]*\})',
+    r'(?P<CADEIA>"[^\n"]*")',
+    rf'(?P<PALAVRA>{_PALAVRA})',
+    r'(?P<NUM_REAL>[0-9]+\.[0-9]+)',
+    r'(?P<NUM_INT>[0-9]+)',
+    r'(?P<WS>[ \t\r\n]+)',
+    '(?P<SIMBOLO>' + '|'.join(re.escape(s) for s in sorted(SIMBOLOS, key=len, reverse=True)) + ')',
+    r'(?P<ErrorChar>.)',
+]), re.DOTALL)
+
+TIPOS = {'CADEIA': LAGrammarLexer.CADEIA, 'NUM_REAL': LAGrammarLexer.NUM_REAL,
+         'NUM_INT': LAGrammarLexer.NUM_INT, 'ErrorChar': LAGrammarLexer.ErrorChar}
+DESCARTADOS = ('WS', 'COMMENTS')  # Regras com -> skip
+
+class LexerRapido:
+    # Tem o que o CommonTokenStream, o ListTokenSource e o parser usam do lexer:
+    # nextToken(), line, column e a fábrica de tokens
+    def __init__(self, texto):
+        self.texto = texto
+        self.line = 1
+        self.column = 0
+        self._factory = CommonTokenFactory.DEFAULT
+        self._tokens = self._gera()
+        self._eof = None
+
+    def _gera(self):
+        fonte = (self, None)
+        texto = self.texto
+        inicio_linha = 0  # Posição do primeiro caractere da linha atual
+        for m in MESTRE.finditer(texto):
+            regra = m.lastgroup
+            inicio = m.start()
+            if regra not in DESCARTADOS:
+                lexema = m.group()
+                if regra == 'PALAVRA':
+                    tipo = PALAVRAS.get(lexema, LAGrammarLexer.IDENT)
+                elif regra == 'SIMBOLO':
+                    tipo = SIMBOLOS[lexema]
+                else:
+                    tipo = TIPOS[regra]
+                self.column = inicio - inicio_linha
+                token = CommonToken(fonte, tipo, Token.DEFAULT_CHANNEL, inicio, m.end() - 1)
+                token.text = lexema
+                yield token
+            else:
+                # Só os espaços e comentários, que são descartados, têm quebras de linha
+                quebras = texto.count('\n', inicio, m.end())
+                if quebras:
+                    self.line += quebras
+                    inicio_linha = texto.rindex('\n', inicio, m.end()) + 1
+        self.column = len(texto) - inicio_linha
+
+    def nextToken(self):
+        token = next(self._tokens, None)
+        if token is not None:
+            return token
+        # Como o lexer do ANTLR, depois do fim devolve sempre o EOF
+        if self._eof is None:
+            fim = len(self.texto)
+            self._eof = CommonToken((self, None), Token.EOF, Token.DEFAULT_CHANNEL, fim, fim - 1)
+            self._eof.text = '<EOF>'
+        return self._eof
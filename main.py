@@ -1,437 +1,857 @@
 import sys
+if __name__ == '__main__':
+    # Com o servidor de análise (servidor.py) rodando, a análise é feita por ele,
+    # sem pagar a importação do ANTLR e a desserialização dos ATNs a cada execução
+    import cliente
+    if cliente.analisa_no_servidor(sys.argv[1:]):
+        sys.exit(0)
 from antlr4 import *
 from LAGrammarLexer import LAGrammarLexer
 from LAGrammarParser import LAGrammarParser
 from antlr4.error.ErrorListener import ErrorListener
+from antlr4.error.ErrorStrategy import BailErrorStrategy, DefaultErrorStrategy
+from antlr4.error.Errors import ParseCancellationException
+from antlr4.atn.PredictionMode import PredictionMode
+import argparse
+import heapq
+from tabela_simbolos import TabelaSimbolos, Simbolo, caminho, VARIAVEL, CONSTANTE, FUNCAO, PROCEDIMENTO, TIPO
+import tipos
+from cache import CacheResultados, LIMITE_PADRAO
+from perfil import Perfil, mede_fase
+from paralelo import parse_paralelo
+import arvore
+import memoria
+from lexico import LexerRapido
+from concurrent.futures import ProcessPoolExecutor
+import json
 import re
+import resource
+
+class LimiteErros(Exception):
+    # Os max_errors primeiros erros da saída já não podem mais mudar; a análise para aqui
+    pass
 
 class SemanticErrorListener(ErrorListener):
-    def __init__(self):
+    def __init__(self, output_file=None, max_errors=None):
         super().__init__()
         self.errors = []
+        self.vistos = set()  # Índice (linha, msg) para a deduplicação em O(1)
+        self.max_errors = max_errors
+        self.escritos = 0
+        # Modo streaming: os erros são escritos assim que nenhuma linha anterior pode mais gerar erro
+        self.saida = open(output_file, 'w') if output_file is not None else None
+        # Heap de (linha, ordem de chegada, msg) ainda não escritos (streaming) ou
+        # ainda não fechados (com max_errors, para saber quando parar)
+        self.pendentes = []
+        self.fechados = 0  # Erros em linhas que nenhum nó seguinte pode mais alcançar
+        self.esgotado = False  # LimiteErros já levantado; o parser ainda pode estar saindo das regras
 
     def add_error(self, line, msg):
-        if (line, msg) not in self.errors:
+        if (line, msg) not in self.vistos:
+            self.vistos.add((line, msg))
             self.errors.append((line, msg))
+            if self.saida is not None or self.max_errors is not None:
+                heapq.heappush(self.pendentes, (line, len(self.errors), msg))
 
     def has_errors(self):
         return len(self.errors) > 0
 
+    def syntaxError(self, recognizer, offendingSymbol, line, column, msg, e):
+        # Sem limite, os erros de sintaxe não entram na saída: o parser se recupera e a
+        # análise semântica segue com a árvore que ele conseguir montar. Com max_errors,
+        # eles contam para o limite, e o parse para assim que o limite é atingido
+        if self.max_errors is None:
+            return
+        if offendingSymbol is None or offendingSymbol.type == Token.EOF:
+            texto = 'EOF'
+        else:
+            texto = offendingSymbol.text
+        self.add_error(line, f"erro sintatico proximo a {texto}")
+        if len(self.errors) >= self.max_errors:
+            self.esgotado = True
+            raise LimiteErros()
+
+    def reinicia(self):
+        # Descarta os erros registrados (e o que já foi escrito no modo streaming)
+        # para refazer a análise do início
+        self.errors = []
+        self.vistos = set()
+        self.pendentes = []
+        self.fechados = 0
+        self.escritos = 0
+        self.esgotado = False
+        if self.saida is not None:
+            self.saida.seek(0)
+            self.saida.truncate()
+
+    def descarrega(self, linha):
+        # Chamado quando nenhum nó seguinte pode gerar erro antes de `linha`. Com max_errors,
+        # levanta LimiteErros assim que os erros fechados bastam para a saída, que fica
+        # igual à da análise completa
+        self.fecha(linha)
+        if self.max_errors is not None and self.fechados >= self.max_errors:
+            self.esgotado = True
+            raise LimiteErros()
+
+    def fecha(self, linha):
+        # Fecha os erros pendentes das linhas anteriores a `linha`; no modo streaming eles
+        # são escritos, na mesma ordem do print_errors
+        escreveu = False
+        while self.pendentes and self.pendentes[0][0] < linha:
+            line, _, msg = heapq.heappop(self.pendentes)
+            self.fechados += 1
+            if self.saida is not None:
+                self.escreve(self.saida, line, msg)
+                escreveu = True
+        if escreveu:
+            self.saida.flush()
+
+    def escreve(self, f, line, msg):
+        # Respeita o limite total de erros, se houver
+        if self.max_errors is None or self.escritos < self.max_errors:
+            f.write(f"Linha {line}: {msg}\n")
+            self.escritos += 1
+
     def print_errors(self, output_file):
+        if self.saida is not None:
+            self.fecha(float('inf'))
+            self.saida.write("Fim da compilacao\n")
+            self.saida.close()
+            self.saida = None
+            return
+
         self.errors.sort(key=lambda x: x[0])  # Ordena os erros pela linha
         with open(output_file, 'w') as f:
             for error in self.errors:
-                f.write(f"Linha {error[0]}: {error[1]}\n")
+                self.escreve(f, error[0], error[1])
             f.write("Fim da compilacao\n")
 
-class LAGrammarSemanticAnalyzer(ParseTreeListener):
+class TextoNos:
+    # Texto de cada nó da árvore, montado uma única vez a partir do intervalo
+    # de tokens do nó e guardado, em vez de percorrer a subárvore a cada getText()
+    def __init__(self, tokens=None):
+        # Sem tokens (ou com erros de sintaxe, quando a árvore pode ter tokens
+        # "<missing ...>" inventados pela recuperação) usa o getText() do próprio nó
+        self.tokens = tokens
+        self.cache = {}
+
+    def __call__(self, ctx):
+        if isinstance(ctx, TerminalNode):
+            return ctx.getText()
+        texto = self.cache.get(ctx)
+        if texto is None:
+            if self.tokens is None:
+                texto = ctx.getText()
+            elif ctx.stop is None or ctx.stop.tokenIndex < ctx.start.tokenIndex:
+                texto = ""
+            else:
+                texto = "".join(token.text for token in self.tokens[ctx.start.tokenIndex:ctx.stop.tokenIndex + 1])
+            self.cache[ctx] = texto
+        return texto
+
+class LAGrammarSemanticAnalyzer:
+    # Percorre o AST (arvore.py); cada nó chama aqui o seu método de entrada e de saída
     def __init__(self, error_listener):
-        self.symbol_table = {}
-        self.local_symbol_table = {}
-        self.current_scope = "global"
+        self.tabela = TabelaSimbolos()
         self.error_listener = error_listener
         self.in_function = False
         self.in_procedure = False
         self.in_constante = False
-        self.procedure_table = {}
         self.nome = {}
         self.function = {}
         self.var_procedimento = {}
-        self.tipos = {}
-        self.registros = {}
         self.declaracao = {}
         self.escreva = {}
-
-
-    def enterDeclaracoes_variaveis(self, ctx: LAGrammarParser.Declaracoes_variaveisContext):
-        for declaracao_var in ctx.declaracao_variavel():
+        self.tipos_expressao = {}  # Tipo já calculado de cada arvore.Expressao
+
+
+    def tipo_de(self, no: arvore.NoTipo):
+        # Converte o tipo escrito no código no objeto tipos.Tipo correspondente (único por tipo)
+        if no.alvo is not None:
+            return tipos.ponteiro(self.tipo_de(no.alvo))
+        if no.ident:
+            simbolo = self.tabela.busca(no.nome)
+            if simbolo is not None and simbolo.categoria == TIPO:
+                return simbolo.tipo
+            return tipos.alias(no.nome)
+        return tipos.primitivo(no.nome)
+
+    def exitDecl_local_global(self, ctx: arvore.DeclLocalGlobal):
+        # Nenhum nó depois desta declaração gera erro em linha anterior ao seu fim
+        self.error_listener.descarrega(ctx.linha_fim)
+
+    def exitComando(self, ctx: arvore.Comando):
+        # O mesmo vale para cada comando do corpo principal do algoritmo (o AST só tem esses)
+        self.error_listener.descarrega(ctx.linha_fim)
+
+    def enterDeclaracoes_variaveis(self, ctx: arvore.DeclaracoesVariaveis):
+        for declaracao_var in ctx.declaracoes:
             self.enterDeclaracao_variavel(declaracao_var)
 
 
-    def enterDeclaracao_variavel(self, ctx: LAGrammarParser.Declaracao_variavelContext):
-        tipo = ctx.tipo().getText()
-        identificadores = ctx.identificadores().identificador()
+    def enterDeclaracao_variavel(self, ctx: arvore.DeclaracaoVariavel):
+        tipo = self.tipo_de(ctx.tipo)
+        identificadores = ctx.identificadores
 
         for identificador in identificadores:
-            nome = identificador.getText()
+            nome = identificador.nome
             nome_lista = re.sub(r'\[\d+\]$', '', nome)
             self.declaracao = nome_lista  
             # print(self.declaracao)    
 
-            # Verifica se o identificador já está na tabela de símbolos gerais
-            if nome in self.symbol_table:
-                self.error_listener.add_error(identificador.start.line, f"identificador {nome} ja declarado anteriormente")
+            # Verifica se o identificador já foi declarado no escopo atual
+            if self.tabela.declarado_no_escopo(caminho(nome)[0]):
+                self.error_listener.add_error(identificador.linha, f"identificador {nome} ja declarado anteriormente")
             else:
-                # Verifica se o identificador já está na tabela de procedimentos
-                if nome in self.procedure_table:
-                    self.error_listener.add_error(identificador.start.line, f"identificador {nome} ja declarado anteriormente")
-                else:
-                  
-                    if tipo in self.tipos:
-                        self.error_listener.add_error(identificador.start.line, f"identificador {nome} ja declarado como tipo")
-                    else:
-                        self.symbol_table[nome] = tipo
+                self.tabela.declara(Simbolo(caminho(nome)[0], VARIAVEL, tipo))
     
 
 
-    def enterFuncoes(self, ctx: LAGrammarParser.FuncaoContext):
-        for funcao_ctx in ctx.funcao():
-            self.enterFuncao(funcao_ctx)
-            
-    def enterFuncao(self, ctx: LAGrammarParser.FuncaoContext):
+    def enterFuncao(self, ctx: arvore.Funcao):
         self.in_function = True
 
-        nome_funcao = ctx.IDENT().getText()
-        tipo_retorno = ctx.tipo().getText()
-        parametros = ctx.parametros().parametro() if ctx.parametros() else []
+        nome_funcao = ctx.nome
+        tipo_retorno = self.tipo_de(ctx.tipo)
+        parametros = ctx.parametros
 
         # Verifica se a função já foi declarada anteriormente
-        if nome_funcao in self.symbol_table:
-            self.error_listener.add_error(ctx.start.line, f"funcao {nome_funcao} já declarada anteriormente")
+        if self.tabela.declarado_no_escopo(nome_funcao):
+            self.error_listener.add_error(ctx.linha, f"funcao {nome_funcao} já declarada anteriormente")
         else:
             # Adiciona a função à tabela de símbolos
-            self.symbol_table[nome_funcao] = {
-                'tipo_retorno': tipo_retorno,
-                'parametros': [(param.identificador().getText(), param.tipo().getText()) for param in parametros]
-            }
-
+            self.tabela.declara(Simbolo(nome_funcao, FUNCAO, tipo_retorno, [
+                (nome, self.tipo_de(tipo)) for nome, tipo in parametros
+            ]))
 
-        self.local_symbol_table = {param.identificador().getText(): None for param in parametros}
+        self.abre_escopo_parametros(parametros)
 
 
-
-    def enterProcedimentos(self, ctx: LAGrammarParser.ProcedimentoContext):
-        for procediemento_ctx in ctx.procedimento():
-            self.enterProcedimento(procediemento_ctx)
-
-    def enterProcedimento(self, ctx: LAGrammarParser.ProcedimentoContext):
+    def enterProcedimento(self, ctx: arvore.Procedimento):
         self.in_procedure = True
-        nome_procedimento = ctx.IDENT().getText()
-        parametros = ctx.parametros().parametro() if ctx.parametros() else []
+        nome_procedimento = ctx.nome
+        parametros = ctx.parametros
 
         # Verifica se o procedimento já foi declarado anteriormente
-        if nome_procedimento in self.symbol_table:
-            self.error_listener.add_error(ctx.start.line, f"procedimento {nome_procedimento} já declarado anteriormente")
+        if self.tabela.declarado_no_escopo(nome_procedimento):
+            self.error_listener.add_error(ctx.linha, f"procedimento {nome_procedimento} já declarado anteriormente")
         else:
-            # Adiciona o procedimento à tabela de símbolos de procedimentos
-            self.symbol_table[nome_procedimento] = {
-                'parametros': [(param.identificador().getText(), param.tipo().getText()) for param in parametros]
-            }
-            self.local_symbol_table = {param.identificador().getText() for param in parametros}
+            # Adiciona o procedimento à tabela de símbolos
+            self.tabela.declara(Simbolo(nome_procedimento, PROCEDIMENTO, parametros=[
+                (nome, self.tipo_de(tipo)) for nome, tipo in parametros
+            ]))
 
+        self.abre_escopo_parametros(parametros)
 
-    def exitProcedimento(self, ctx: LAGrammarParser.ProcedimentoContext):
+    def abre_escopo_parametros(self, parametros):
+        # Os parâmetros e as declarações do corpo ficam num escopo próprio do subprograma
+        self.tabela.abre_escopo()
+        for nome, tipo in parametros:
+            self.tabela.declara(Simbolo(caminho(nome)[0], VARIAVEL, self.tipo_de(tipo)))
+
+    def exitProcedimento(self, ctx: arvore.Procedimento):
         self.in_procedure = False
+        self.tabela.fecha_escopo()
 
-    def enterChamada_procedimento_cmd(self, ctx: LAGrammarParser.Chamada_procedimento_cmdContext):
-        nome_procedimento = ctx.identificador().getText()
-        argumentos = ctx.argumentos().expressao() if ctx.argumentos() else []
+    def enterChamada_procedimento_cmd(self, ctx: arvore.ChamadaProcedimento):
+        nome_procedimento = ctx.nome
+        argumentos = ctx.argumentos
 
-        if nome_procedimento in self.symbol_table:
-            params_esperados = self.symbol_table[nome_procedimento]['parametros']
+        simbolo = self.tabela.busca(nome_procedimento)
+        if simbolo is not None:
+            params_esperados = simbolo.parametros
             params_fornecidos = [self.get_tipo_expressao(arg) for arg in argumentos]
 
-            if len(params_esperados) != len(params_fornecidos):
-                self.error_listener.add_error(ctx.start.line, f"incompatibilidade de parâmetros na chamada de {nome_procedimento}")
+            if params_esperados is not None and len(params_esperados) != len(params_fornecidos):
+                self.error_listener.add_error(ctx.linha, f"incompatibilidade de parâmetros na chamada de {nome_procedimento}")
         else:
-            self.error_listener.add_error(ctx.start.line, f"procedimento '{nome_procedimento}' não declarado")
+            self.error_listener.add_error(ctx.linha, f"procedimento '{nome_procedimento}' não declarado")
 
 
-    def enterConstante(self, ctx: LAGrammarParser.ConstanteContext):
-        nome_constante = ctx.IDENT().getText()
-        tipo_constante = ctx.tipo().getText()
-        valor_constante = ctx.expressao().getText()
+    def enterConstante(self, ctx: arvore.Constante):
+        nome_constante = ctx.nome
+        tipo_constante = self.tipo_de(ctx.tipo)
+        valor_constante = ctx.valor
 
-        if nome_constante in self.symbol_table:
-            self.error_listener.add_error(ctx.start.line, f"Constante '{nome_constante}' já declarada anteriormente")
+        if self.tabela.declarado_no_escopo(nome_constante):
+            self.error_listener.add_error(ctx.linha, f"Constante '{nome_constante}' já declarada anteriormente")
         else:
-            self.symbol_table[nome_constante] = {
-                'tipo': tipo_constante,
-                'valor': valor_constante,
-                'constante': True
-            }
-    def exitConstante(self, ctx: LAGrammarParser.ConstanteContext):
+            self.tabela.declara(Simbolo(nome_constante, CONSTANTE, tipo_constante, valor=valor_constante))
+    def exitConstante(self, ctx: arvore.Constante):
         self.in_procedure = False
     
-    def enterDeclaracao_tipo_lista(self, ctx: LAGrammarParser.Declaracao_tipo_listaContext):
-        nome_tipo = ctx.IDENT().getText()
-        registro_ctx = ctx.registro()
+    def enterDeclaracao_tipo_lista(self, ctx: arvore.DeclaracaoTipoLista):
+        nome_tipo = ctx.nome
         
-        if nome_tipo in self.symbol_table:
-            self.error_listener.add_error(ctx.start.line, f"Tipo '{nome_tipo}' ja declarado anteriormente")
+        if self.tabela.declarado_no_escopo(nome_tipo):
+            self.error_listener.add_error(ctx.linha, f"Tipo '{nome_tipo}' ja declarado anteriormente")
         else:
-            campos_registro = self.enterRegister(registro_ctx)
-            self.symbol_table[nome_tipo] = {
-                'tipo': 'registro',
-                'campos': campos_registro
-            }
-
-    def enterRegister(self, ctx: LAGrammarParser.RegistroContext):
-        campos = ctx.campos_registro().campo_registro()
-        registro_campos = []
-        registros = set()
+            campos_registro = self.enterRegister(ctx.campos)
+            self.tabela.declara_registro(nome_tipo, campos_registro)
 
+    def enterRegister(self, campos):
+        registro_campos = []
 
-        for campo in campos:
-            identificadores_ctx = campo.identificadores().identificador()
-            tipo = campo.tipo().getText()
+        for tipo_campo, identificadores in campos:
+            tipo = self.tipo_de(tipo_campo)
 
-            for ident_ctx in identificadores_ctx:
-                ident = ident_ctx.getText()
+            for ident in identificadores:
                 registro_campos.append((ident,tipo))
-                registros.add(ident) 
-
-        self.registros = registros
 
         return registro_campos
 
 
-    def exitFuncao(self, ctx: LAGrammarParser.FuncaoContext):
+    def exitFuncao(self, ctx: arvore.Funcao):
         self.in_function = False
+        self.tabela.fecha_escopo()
 
-    def enterRetorno(self, ctx: LAGrammarParser.RetornoContext):
+    def enterRetorno(self, ctx: arvore.Retorno):
         if not self.in_function:
-            self.error_listener.add_error(ctx.start.line, "comando retorne nao permitido nesse escopo")
+            self.error_listener.add_error(ctx.linha, "comando retorne nao permitido nesse escopo")
 
-    def enterChamada_funcao_cmd(self, ctx: LAGrammarParser.Chamada_funcao_cmdContext):
-        nome_funcao = ctx.identificador().getText()
-        argumentos = ctx.argumentos().expressao() if ctx.argumentos() else []
+    def enterChamada_funcao_cmd(self, ctx: arvore.ChamadaFuncao):
+        nome_funcao = ctx.nome
+        argumentos = ctx.argumentos
 
         
 
-        if nome_funcao in self.symbol_table:
-            funcao_info = self.symbol_table[nome_funcao]
-            if isinstance(funcao_info, dict) and 'parametros' in funcao_info:
-                params_esperados = funcao_info['parametros']
+        funcao_info = self.tabela.busca(nome_funcao)
+        if funcao_info is not None:
+            if funcao_info.parametros is not None:
+                params_esperados = funcao_info.parametros
                 params_fornecidos = [self.get_tipo_expressao(arg) for arg in argumentos]
 
 
                 if len(params_esperados) != len(params_fornecidos):
-                    self.error_listener.add_error(ctx.start.line, f"incompatibilidade de numero de parametros na chamada de {nome_funcao}")
+                    self.error_listener.add_error(ctx.linha, f"incompatibilidade de numero de parametros na chamada de {nome_funcao}")
                 else:
                     for i, (esperado, fornecido) in enumerate(zip(params_esperados, params_fornecidos)):
-                        if esperado[1] != fornecido and fornecido != 'indefinido':
-                            self.error_listener.add_error(ctx.start.line, f"incompatibilidade de numero de parametros na chamada de {nome_funcao}")
+                        if esperado[1] is not fornecido and fornecido is not tipos.INDEFINIDO:
+                            self.error_listener.add_error(ctx.linha, f"incompatibilidade de numero de parametros na chamada de {nome_funcao}")
             
-    def enterIdentificador(self, ctx: LAGrammarParser.IdentificadorContext):
-        nome = ctx.getText()
-
-        if '.' in nome:
-            registro, campo = nome.split('.')
+    def enterIdentificador(self, ctx: arvore.Identificador):
+        nome = ctx.nome
 
+        # Cada campo do caminho precisa existir no registro do segmento anterior
+        if '.' in nome and self.tabela.resolve(nome) is None:
+            self.error_listener.add_error(ctx.linha, f"identificador {nome} nao declarado")
 
-            if campo in self.registros:
-                return  
-            else:
-                if registro in self.symbol_table:
-                    return
-                else:
-                    self.error_listener.add_error(ctx.start.line, f"identificador {nome} nao declarado")
-                    
-
-    def exitAtribuicao_cmd(self, ctx: LAGrammarParser.Atribuicao_cmdContext):
-        identificador = ctx.identificador()
-        expressao = ctx.expressao()
+    def exitAtribuicao_cmd(self, ctx: arvore.Atribuicao):
+        identificador = ctx.identificador
+        expressao = ctx.expressao
 
         if identificador is not None:
             self.processaAtribuicao(identificador, expressao)
         else:
-            self.error_listener.add_error(ctx.start.line, f"atribuicao nao compativel para {ctx.getText().split('<-')[0]}")
+            self.error_listener.add_error(ctx.linha, f"atribuicao nao compativel para {ctx.texto.split('<-')[0]}")
 
     def processaAtribuicao(self, identificador, expressao):
-        nome_identificador = identificador.getText() if identificador is not None else None
+        nome_identificador = identificador.nome if identificador is not None else None
         
         if nome_identificador is not None:
-            # Verifica se o identificador é uma função
-            if nome_identificador in self.symbol_table and isinstance(self.symbol_table[nome_identificador], dict):
-                self.error_listener.add_error(identificador.start.line, f"{nome_identificador} é uma função e não pode ser atribuída diretamente")
+            # Verifica se o identificador é uma função (ou outro símbolo que não é variável)
+            simbolo = self.tabela.busca(nome_identificador)
+            if simbolo is not None and simbolo.categoria != VARIAVEL:
+                self.error_listener.add_error(identificador.linha, f"{nome_identificador} é uma função e não pode ser atribuída diretamente")
             else:
                 self.enterIdentificador(identificador)  # Verifica se o identificador está na tabela de símbolos
 
                 tipo_variavel = self.getTipoVariavel(nome_identificador)
                 
                 # Verifica se a expressão é um endereço (&)
-                if expressao.getText().startswith('&'):
+                if expressao.texto.startswith('&'):
                     self.processaEnderecoAtribuicao(identificador, expressao)
-                elif expressao.getText().startswith('-'):
+                elif expressao.texto.startswith('-'):
                     self.processaAtribuicaoNegativa(identificador, expressao)
                 else:
                     tipo_expressao = self.get_tipo_expressao(expressao)
 
                     if tipo_variavel is None and not tipo_expressao is not None:
-                        self.error_listener.add_error(identificador.start.line, f"atribuicao nao compativel para {nome_identificador}")
+                        self.error_listener.add_error(identificador.linha, f"atribuicao nao compativel para {nome_identificador}")
                     elif tipo_expressao is None:
-                        self.error_listener.add_error(identificador.start.line, f"atribuicao nao compativel para {nome_identificador}")
-                    elif nome_identificador not in self.symbol_table :
-                        if '.' in nome_identificador:
-                            registro, campo = nome_identificador.split('.')
-                            if campo in self.registros:
-                                return  # Identificador dentro de um registro está corretamente declarado
-                            else:
-                                if registro in self.symbol_table:
-                                    return
-                                else:
-                                    self.error_listener.add_error(identificador.start.line, f"identificador {nome_identificador} nao declarado")
-                        else:
-                            self.error_listener.add_error(identificador.start.line, f"identificador {nome_identificador} nao declarado")
+                        self.error_listener.add_error(identificador.linha, f"atribuicao nao compativel para {nome_identificador}")
+                    elif self.tabela.resolve(nome_identificador) is None:
+                        self.error_listener.add_error(identificador.linha, f"identificador {nome_identificador} nao declarado")
 
         else:
-            self.error_listener.add_error(identificador.start.line, "Identificador não encontrado para atribuição")
+            self.error_listener.add_error(identificador.linha, "Identificador não encontrado para atribuição")
 
     def processaAtribuicaoNegativa(self, identificador, expressao):
         # Implementação específica para atribuições com expressão negativa
-        nome_identificador = identificador.getText()
+        nome_identificador = identificador.nome
 
         # Remove o sinal "-" da expressão para obter o identificador correto
-        identificador_negado = expressao.getText()[1:]
+        identificador_negado = expressao.texto[1:]
 
         # Verifica se o identificador está na tabela de símbolos
-        if nome_identificador in self.symbol_table:
-            tipo_variavel = self.symbol_table[nome_identificador]
+        if nome_identificador in self.tabela:
+            tipo_variavel = self.getTipoVariavel(nome_identificador)
             tipo_expressao = self.get_tipo_expressao(identificador_negado)
 
             if tipo_variavel and tipo_expressao:
                 if not self.tipo_compativel(tipo_variavel, tipo_expressao):
-                    self.error_listener.add_error(identificador.start.line, f"atribuicao nao compativel para {nome_identificador}")
+                    self.error_listener.add_error(identificador.linha, f"atribuicao nao compativel para {nome_identificador}")
             elif tipo_variavel is None:
-                self.error_listener.add_error(identificador.start.line, f"atribuicao nao compativel para {nome_identificador}")
+                self.error_listener.add_error(identificador.linha, f"atribuicao nao compativel para {nome_identificador}")
               
     def processaEnderecoAtribuicao(self, identificador, expressao):
-        nome_identificador = identificador.getText()
+        nome_identificador = identificador.nome
 
         # Verifica se o identificador existe na tabela de símbolos
-        if nome_identificador in self.symbol_table:
-            tipo_variavel = self.symbol_table[nome_identificador]
-            tipo_expressao = expressao.getText()[1:]  # Remove o '&'
+        if self.tabela.resolve(nome_identificador) is not None:
+            tipo_variavel = self.getTipoVariavel(nome_identificador)
+            # &x tem o tipo ponteiro para o tipo de x
+            tipo_apontado = self.getTipoVariavel(expressao.texto[1:])  # Remove o '&'
+            tipo_expressao = tipos.ponteiro(tipo_apontado) if tipo_apontado is not None else None
 
             if tipo_variavel and tipo_expressao:
                 if not self.tipo_compativel(tipo_variavel, tipo_expressao):
-                    self.error_listener.add_error(identificador.start.line, f"atribuicao nao compativel para {nome_identificador}")
+                    self.error_listener.add_error(identificador.linha, f"atribuicao nao compativel para {nome_identificador}")
             elif tipo_variavel is None:
-                self.error_listener.add_error(identificador.start.line, f"atribuicao nao compativel para {nome_identificador}")
+                self.error_listener.add_error(identificador.linha, f"atribuicao nao compativel para {nome_identificador}")
         else:
-            self.error_listener.add_error(identificador.start.line, f"identificador {nome_identificador} nao declarado")
+            self.error_listener.add_error(identificador.linha, f"identificador {nome_identificador} nao declarado")
 
 
     def getTipoVariavel(self, nome_identificador):
-        # Verifica se é um campo de registro (ex: ponto1.x)
-        if '.' in nome_identificador:
-            registro, campo = nome_identificador.split('.')
-            if registro in self.symbol_table and isinstance(self.symbol_table[registro], dict) and campo in self.symbol_table[registro]:
-                return self.symbol_table[registro][campo]
-            else:
-                return None
-        else:
-            return self.symbol_table.get(nome_identificador)
+        # Resolve também campos de registro em qualquer profundidade (ex: ponto1.x, a.b.c)
+        return self.tabela.tipo(nome_identificador)
 
         
     def verificar_tipo_variavel(self, identificador):
-    # Verifica se o identificador existe na tabela de símbolos
-        if identificador in self.symbol_table:
-            # Verifica se há uma chave 'tipo' no dicionário associado ao identificador
-            if 'tipo' in self.symbol_table[identificador]:
-                return self.symbol_table[identificador]['tipo']  # Retorna o tipo da variável
-            else:
-                return None  # Ou retorne algo que indique que o tipo não está definido
-        else:
-            return None 
-
-    def get_tipo_expressao(self, ctx: LAGrammarParser.ExpressaoContext):
-        if isinstance(ctx, LAGrammarParser.ExpressaoContext):
+        # Tipo do identificador na tabela de símbolos, ou None se não estiver declarado
+        return self.tabela.tipo(identificador)
+
+    def get_tipo_expressao(self, ctx: arvore.Expressao):
+        # Cada nó de expressão é tipado uma única vez; chamadas aninhadas e
+        # atribuições reaproveitam o tipo guardado em vez de percorrer a subárvore de novo
+        if isinstance(ctx, arvore.Expressao):
+            if ctx not in self.tipos_expressao:
+                self.tipos_expressao[ctx] = self.calcula_tipo_expressao(ctx)
+            return self.tipos_expressao[ctx]
+
+    def calcula_tipo_expressao(self, ctx: arvore.Expressao):
+        forma = ctx.forma
         # Verifica se a expressão é um literal
-            if ctx.literal():
-                return self.getTipoVariavel(ctx.literal().getText())
-            elif ctx.NUM_INT():
-                return "inteiro"
-            elif ctx.NUM_REAL():
-                return "real"
-            if ctx.IDENT():
-                nome_identificador = ctx.IDENT().getText()
-                if '[' in nome_identificador:
-                    nome_base = nome_identificador.split('[')[0].strip()
-                    if nome_base in self.symbol_table:
-                        return self.symbol_table[nome_base]['tipo']
-                    else:
-                        self.error_listener.add_error(ctx.start.line, f"Identificadoooooor {nome_identificador} não declarado")
-                        return "tipo_indefinido"
-                elif nome_identificador in self.symbol_table:
-                    return self.symbol_table[nome_identificador]['tipo']
-                else:
-                    self.error_listener.add_error(ctx.start.line, f"Identiiificador {nome_identificador} não declarado")
-                    return "tipo_indefinido"
-
-            elif ctx.identificador():
-                ident_texto = ctx.identificador().getText()
-                # Verificar se é um identificador de variável declarada
-                tipo_variavel = self.verificar_tipo_variavel(ident_texto)
-                if tipo_variavel:
-                    return tipo_variavel  # Retorna o tipo da variável declarada
-                else:
-                    return "indefinido"
-            elif ctx.chamada_funcao_cmd():
-                # Lógica para determinar o tipo de retorno da função chamada
-                nome_funcao = ctx.chamada_funcao_cmd().identificador().getText()
-                if nome_funcao in self.symbol_table:
-                    return self.symbol_table[nome_funcao]['tipo_retorno']
-                else:
-                    return "tipo_de_retorno_desconhecido"
-            elif ctx.chamada_procedimento_cmd():
-                nome_procedimento = ctx.chamada_procedimento_cmd().identificador().getText()
-                if nome_procedimento in self.procedure_table:
-                    return 'procedimento'
+        if forma is arvore.LITERAL:
+            return self.getTipoVariavel(ctx.valor)
+        elif forma is arvore.NUM_INT:
+            return tipos.INTEIRO
+        elif forma is arvore.NUM_REAL:
+            return tipos.REAL
+        if forma is arvore.IDENT:
+            nome_identificador = ctx.valor
+            if '[' in nome_identificador:
+                nome_base = nome_identificador.split('[')[0].strip()
+                if nome_base in self.tabela:
+                    return self.tabela.busca(nome_base).tipo
                 else:
-                    self.error_listener.add_error(ctx.start.line, f"procedimento '{nome_procedimento}' não declarado")
-                    return 'desconhecido'
-            elif ctx.identificador():
-                nome_identificador = ctx.identificador().getText()
-                return self.getTipoVariavel(nome_identificador)  # Retorna o tipo da variável na tabela de símbolos
-            elif ctx.ponteiro():
-                return "ponteiro"  # Verificar como tratar ponteiros
-            elif ctx.getChild(0).getText() == '-':
-                return self.get_tipo_expressao(ctx.expressao(0))  # Retorna o tipo do identificador após o "-"
-            elif ctx.endereco():
-                return "endereco"  # Verificar como tratar endereços
-            elif ctx.getChild(1) and (ctx.getChild(1).getText() in ['+', '-', '*', '/', '>', '<', '>=', '<=', 'e', 'ou', '<>']):
-                tipo_expr1 = self.get_tipo_expressao(ctx.expressao(0))
-                tipo_expr2 = self.get_tipo_expressao(ctx.expressao(1))
-                if tipo_expr1 == tipo_expr2:
-                    return tipo_expr1
-                else:
-                    return "tipo_indefinido"
+                    self.error_listener.add_error(ctx.linha, f"Identificadoooooor {nome_identificador} não declarado")
+                    return tipos.TIPO_INDEFINIDO
+            elif nome_identificador in self.tabela:
+                return self.tabela.busca(nome_identificador).tipo
+            else:
+                self.error_listener.add_error(ctx.linha, f"Identiiificador {nome_identificador} não declarado")
+                return tipos.TIPO_INDEFINIDO
+
+        elif forma is arvore.IDENTIFICADOR:
+            # Verificar se é um identificador de variável declarada
+            tipo_variavel = self.verificar_tipo_variavel(ctx.valor)
+            if tipo_variavel:
+                return tipo_variavel  # Retorna o tipo da variável declarada
+            else:
+                return tipos.INDEFINIDO
+        elif forma is arvore.CHAMADA_FUNCAO:
+            # Lógica para determinar o tipo de retorno da função chamada
+            simbolo = self.tabela.busca(ctx.valor)
+            if simbolo is not None and simbolo.categoria == FUNCAO:
+                return simbolo.tipo
             else:
-                return "tipo_indefinido"
+                return tipos.RETORNO_DESCONHECIDO
+        elif forma is arvore.CHAMADA_PROCEDIMENTO:
+            nome_procedimento = ctx.valor
+            simbolo = self.tabela.busca(nome_procedimento)
+            if simbolo is not None and simbolo.categoria == PROCEDIMENTO:
+                return tipos.PROCEDIMENTO
+            else:
+                self.error_listener.add_error(ctx.linha, f"procedimento '{nome_procedimento}' não declarado")
+                return tipos.DESCONHECIDO
+        elif forma is arvore.PONTEIRO:
+            return tipos.PONTEIRO_GENERICO  # Verificar como tratar ponteiros
+        elif forma is arvore.NEGATIVO:
+            return self.get_tipo_expressao(ctx.operandos[0])  # Retorna o tipo do identificador após o "-"
+        elif forma is arvore.ENDERECO:
+            return tipos.ENDERECO  # Verificar como tratar endereços
+        elif forma is arvore.BINARIA:
+            tipo_expr1 = self.get_tipo_expressao(ctx.operandos[0])
+            tipo_expr2 = self.get_tipo_expressao(ctx.operandos[1])
+            if tipo_expr1 is tipo_expr2:
+                return tipo_expr1
+            else:
+                return tipos.TIPO_INDEFINIDO
+        else:
+            return tipos.TIPO_INDEFINIDO
 
     def tipo_compativel(self, tipo_var, tipo_expr):
-        if tipo_var == tipo_expr:
-            return True
-        if (tipo_var == "real" and tipo_expr == "inteiro") or (tipo_var == "inteiro" and tipo_expr == "real"):
-            return True
-        return False
+        return tipos.compativel(tipo_var, tipo_expr)
+
+def parse_programa(parser, stream, error_listener, modo_rapido=False):
+    # Retorna a árvore e qual predição foi usada ('SLL' ou 'LL')
+    if modo_rapido:
+        # Primeira tentativa: predição SLL, abortando no primeiro erro sem reportá-lo
+        parser.removeErrorListeners()
+        parser._errHandler = BailErrorStrategy()
+        parser._interp.predictionMode = PredictionMode.SLL
+        try:
+            return parser.programa(), 'SLL'
+        except ParseCancellationException:
+            # SLL falhou: volta ao início e refaz com LL completo, reportando os erros normalmente
+            stream.seek(0)
+            parser.reset()
+            parser._errHandler = DefaultErrorStrategy()
+            parser._interp.predictionMode = PredictionMode.LL
 
-def main(input_file, output_file):
-    input_stream = FileStream(input_file, encoding='utf-8')
-    lexer = LAGrammarLexer(input_stream)
-    stream = CommonTokenStream(lexer)
-    parser = LAGrammarParser(stream)
-    
     # Remover o listener de erros padrão e adicionar o nosso customizado
     parser.removeErrorListeners()
-    error_listener = SemanticErrorListener()
     parser.addErrorListener(error_listener)
-    
-    tree = parser.programa()
+    return parser.programa(), 'LL'
+
+class AnaliseDuranteParse(ParseTreeListener):
+    # Com max_errors, cada unidade (declaração global, e cada declaração e comando do
+    # corpo do algoritmo) é convertida e verificada assim que o parser sai dela, na
+    # mesma ordem do percurso do AST inteiro. Quando os erros da saída estão decididos,
+    # o LimiteErros sobe de dentro do parser.programa() e para o parser e também o
+    # lexer, que só gera os tokens que o parser pede
+    def __init__(self, parser, stream, error_listener, perfil=None, desiste=False):
+        self.parser = parser
+        self.analyzer = LAGrammarSemanticAnalyzer(error_listener)
+        if perfil is not None:
+            perfil.instrumenta(self.analyzer)
+        self.perfil = perfil
+        self.rebaixador = arvore.Rebaixador(TextoNos(stream.tokens))
+        self.percurso = arvore.Percurso()
+        self.desiste = desiste  # Tentativa SLL, que desiste no primeiro erro de sintaxe
+        self.parado = False
+
+    def unidade(self, ctx):
+        if isinstance(ctx, LAGrammarParser.Decl_local_globalContext):
+            return True
+        if isinstance(ctx, LAGrammarParser.ComandosContext):
+            return False  # Cada comando é uma unidade
+        corpo = ctx.parentCtx.parentCtx if isinstance(ctx, LAGrammarParser.ComandoContext) else ctx.parentCtx
+        return (isinstance(corpo, LAGrammarParser.CorpoContext)
+                and isinstance(corpo.parentCtx, LAGrammarParser.ProgramaContext))
+
+    def exitEveryRule(self, ctx):
+        if self.parado or self.analyzer.error_listener.esgotado:
+            # LimiteErros (do percurso ou de um erro de sintaxe) ou a desistência do SLL
+            # subindo pelas regras ainda abertas
+            return
+        if self.desiste and ctx.exception is not None:
+            # O BailErrorStrategy marca as regras abertas com o erro antes de desistir
+            self.parado = True
+            return
+        if not self.unidade(ctx):
+            return
+        if self.rebaixador.texto.tokens is not None and self.parser.getNumberOfSyntaxErrors() > 0:
+            # Daqui em diante a árvore pode ter tokens inventados pela recuperação
+            self.rebaixador.texto = TextoNos()
+        if self.perfil is not None:
+            self.perfil.conta_nos(ctx)
+        ast = self.rebaixador.baixa(ctx)
+        ctx.children = None
+        try:
+            self.percurso.percorre(self.analyzer, ast)
+        except LimiteErros:
+            self.parado = True
+            raise
+        # Como no modo de memória limitada, os tipos das expressões da unidade são soltos
+        self.analyzer.tipos_expressao.clear()
+
+def analisa_durante_parse(parser, stream, error_listener, estatisticas, modo_rapido=False, perfil=None):
+    # Parse com a análise semântica feita junto (AnaliseDuranteParse). Os erros de
+    # sintaxe seguem a mesma política da análise normal, inclusive o SLL/LL
+    parser.removeErrorListeners()
+    if modo_rapido:
+        estatisticas['predicao'] = 'SLL'
+        parser._errHandler = BailErrorStrategy()
+        parser._interp.predictionMode = PredictionMode.SLL
+        parser.addParseListener(AnaliseDuranteParse(parser, stream, error_listener, perfil, desiste=True))
+        try:
+            parser.programa()
+            return
+        except ParseCancellationException:
+            # SLL falhou: o que foi verificado até aqui é descartado e tudo é refeito com LL
+            error_listener.reinicia()
+            stream.seek(0)
+            parser.reset()
+            parser.removeParseListeners()
+            parser._errHandler = DefaultErrorStrategy()
+            parser._interp.predictionMode = PredictionMode.LL
+    estatisticas['predicao'] = 'LL'
+    parser.addErrorListener(error_listener)
+    parser.addParseListener(AnaliseDuranteParse(parser, stream, error_listener, perfil))
+    parser.programa()
 
+class PrimeiraPassada(arvore.Percurso):
+    # Percorre o AST declarando tudo normalmente, mas sem entrar no corpo dos
+    # subprogramas globais, que ficam para a segunda passada
+    def __init__(self):
+        self.subprogramas = []  # (erros até aqui, globais declarados até aqui, nó)
+
+    def percorre(self, analyzer, no):
+        if isinstance(no, (arvore.Funcao, arvore.Procedimento)) and no.global_:
+            self.subprogramas.append((len(analyzer.error_listener.errors), len(analyzer.tabela.escopos[0]), no))
+            # Só a assinatura: enterFuncao declara e abre o escopo, exitFuncao fecha
+            getattr(analyzer, no.entrada)(no)
+            getattr(analyzer, no.saida)(no)
+            return
+        super().percorre(analyzer, no)
+
+_globais = ()  # Símbolos globais da primeira passada, na ordem de declaração
+
+def _inicia_segunda_passada(globais):
+    global _globais
+    _globais = globais
+
+def analisa_subprograma(args):
+    # Segunda passada de um subprograma, num processo à parte: a tabela começa com
+    # os globais declarados antes dele, como na análise sequencial
+    no, declarados = args
+    error_listener = SemanticErrorListener()
     analyzer = LAGrammarSemanticAnalyzer(error_listener)
-    walker = ParseTreeWalker()
-    walker.walk(analyzer, tree)
-
-    error_listener.print_errors(output_file)
+    for simbolo in _globais[:declarados]:
+        analyzer.tabela.declara(simbolo)
+    arvore.Percurso().percorre(analyzer, no)
+    return error_listener.errors
+
+def analisa_duas_passadas(analyzer, ast, workers):
+    # Primeira passada: globais, constantes, registros e assinaturas, com os erros
+    # guardados à parte. Segunda: o corpo de cada subprograma global, em paralelo.
+    destino = analyzer.error_listener
+    analyzer.error_listener = SemanticErrorListener()
+    passada = PrimeiraPassada()
+    passada.percorre(analyzer, ast)
+    erros = analyzer.error_listener.errors
+    analyzer.error_listener = destino
+
+    tabela = analyzer.tabela
+    globais = tuple(tabela.visiveis[nome][-1] for nome in tabela.escopos[0])
+    tarefas = [(no, declarados) for _, declarados, no in passada.subprogramas]
+    if workers > 1 and len(tarefas) > 1:
+        with ProcessPoolExecutor(max_workers=min(workers, len(tarefas)), initializer=_inicia_segunda_passada,
+                                 initargs=(globais,)) as executor:
+            corpos = list(executor.map(analisa_subprograma, tarefas))
+    else:
+        _inicia_segunda_passada(globais)
+        corpos = [analisa_subprograma(tarefa) for tarefa in tarefas]
+
+    # Os erros de cada corpo entram no ponto da lista em que a análise sequencial
+    # os teria encontrado; add_error descarta as repetições do mesmo jeito
+    anterior = 0
+    for (posicao, _, _), corpo in zip(passada.subprogramas, corpos):
+        for line, msg in erros[anterior:posicao] + corpo:
+            destino.add_error(line, msg)
+        anterior = posicao
+    for line, msg in erros[anterior:]:
+        destino.add_error(line, msg)
+
+def cria_lexer(input_file, lexer_rapido=False):
+    if lexer_rapido:
+        # Lido em binário, como o FileStream, para que '\r\n' continue como está no arquivo
+        with open(input_file, 'rb') as f:
+            return LexerRapido(f.read().decode('utf-8'))
+    return LAGrammarLexer(FileStream(input_file, encoding='utf-8'))
+
+def analisa_por_unidade(input_file, error_listener, estatisticas, modo_rapido=False, perfil=None,
+                        lexer_rapido=False):
+    # Modo de memória limitada (memoria.py): cada declaração global é analisada e solta
+    # antes da próxima, e entre elas só ficam a tabela de símbolos e os erros. Retorna
+    # False se houver erro de sintaxe, caso em que o arquivo deve ser analisado inteiro
+    analyzer = LAGrammarSemanticAnalyzer(error_listener)
+    if perfil is not None:
+        perfil.instrumenta(analyzer)
+    percurso = arvore.Percurso()
+    lexer = cria_lexer(input_file, lexer_rapido)
+    for unidade in memoria.unidades(lexer, estatisticas, modo_rapido, perfil):
+        if unidade is None:
+            return False
+        tree, tokens = unidade
+        del unidade
+        if perfil is not None:
+            perfil.conta_nos(tree)
+        with mede_fase(estatisticas, 'ast', perfil):
+            ast = arvore.baixa(tree, TextoNos(tokens))
+            del tree, tokens
+        with mede_fase(estatisticas, 'walk', perfil):
+            percurso.percorre(analyzer, ast)
+        # Os nós desta unidade não são mais visitados: seus tipos também podem ser soltos
+        analyzer.tipos_expressao.clear()
+        del ast
+    return True
+
+def main(input_file, output_file, modo_rapido=False, streaming=False, max_errors=None,
+         cache=None, cache_limite=LIMITE_PADRAO, perfil=False, paralelo=None, fail_fast=False,
+         memoria_limitada=False, lexer_rapido=False):
+    # Tempos de cada fase (em segundos) e a predição usada, para o modo em lote do teste.py
+    estatisticas = {'interrompido': False}
+    # Com perfil, estatisticas['perfil'] recebe também alocações, chamadas dos métodos
+    # do analisador e nós da árvore; sem ele nada disso é medido
+    perfil = Perfil() if perfil else None
+    # fail_fast é o mesmo que --max-errors 1: o primeiro erro, de sintaxe ou semântico,
+    # é escrito e a análise para ali
+    if fail_fast:
+        max_errors = 1
+
+    if cache is not None:
+        # Com o cache, um código já analisado tem a saída copiada direto do disco
+        resultados = CacheResultados(cache, cache_limite)
+        with open(input_file, 'rb') as f:
+            chave = resultados.chave(f.read(), max_errors)
+        conteudo = resultados.busca(chave)
+        if conteudo is not None:
+            estatisticas.update({'lex': 0.0, 'parse': 0.0, 'ast': 0.0, 'walk': 0.0, 'predicao': None, 'cache': 'hit'})
+            with mede_fase(estatisticas, 'saida', perfil):
+                with open(output_file, 'wb') as f:
+                    f.write(conteudo)
+            return completa_estatisticas(estatisticas, perfil)
+        estatisticas['cache'] = 'miss'
+
+    error_listener = None
+    if memoria_limitada:
+        error_listener = SemanticErrorListener(output_file if streaming else None, max_errors)
+        estatisticas['predicao'] = 'SLL' if modo_rapido else 'LL'
+        try:
+            if not analisa_por_unidade(input_file, error_listener, estatisticas, modo_rapido, perfil, lexer_rapido):
+                # Erro de sintaxe: refaz a análise com o arquivo inteiro, do jeito normal
+                if error_listener.saida is not None:
+                    error_listener.saida.close()
+                error_listener = None
+        except LimiteErros:
+            estatisticas['interrompido'] = True
+
+    if error_listener is None:
+        # Com max_errors, a análise semântica é feita durante o parse para que o lexer e o
+        # parser também parem no limite (--paralelo precisa de todos os tokens antes)
+        durante_parse = max_errors is not None and not paralelo
+        with mede_fase(estatisticas, 'lex', perfil):
+            lexer = cria_lexer(input_file, lexer_rapido)
+            stream = CommonTokenStream(lexer)
+            # Consome todos os tokens aqui para medir o lexer separadamente. Durante o
+            # parse, os tokens são gerados conforme o parser pede, e o tempo do lexer
+            # entra no do parse
+            if not durante_parse:
+                stream.fill()
+
+        with mede_fase(estatisticas, 'parse', perfil):
+            parser = LAGrammarParser(stream)
+            error_listener = SemanticErrorListener(output_file if streaming else None, max_errors)
+            if durante_parse:
+                try:
+                    analisa_durante_parse(parser, stream, error_listener, estatisticas, modo_rapido, perfil)
+                except LimiteErros:
+                    # Os primeiros max_errors erros já estão decididos; o resto do arquivo não muda a saída
+                    estatisticas['interrompido'] = True
+            else:
+                # Com `paralelo` processos, as declarações globais são analisadas em paralelo;
+                # se não for possível, a análise sequencial é feita normalmente
+                tree = parse_paralelo(parser, stream, paralelo, modo_rapido) if paralelo else None
+                if tree is not None:
+                    estatisticas['predicao'] = 'SLL' if modo_rapido else 'LL'
+                else:
+                    try:
+                        tree, estatisticas['predicao'] = parse_programa(parser, stream, error_listener, modo_rapido)
+                    except LimiteErros:
+                        # Os erros de sintaxe já bastam para a saída
+                        estatisticas['interrompido'] = True
+
+        if durante_parse or estatisticas['interrompido']:
+            # A conversão e o percurso foram feitos, e medidos, junto com o parse
+            # (ou não foram feitos, se o limite veio dos erros de sintaxe)
+            estatisticas['ast'] = estatisticas['walk'] = 0.0
+            del lexer, stream, parser
+        else:
+            if perfil is not None:
+                perfil.conta_nos(tree)
+
+            with mede_fase(estatisticas, 'ast', perfil):
+                ast = arvore.baixa(tree, TextoNos(stream.tokens if parser.getNumberOfSyntaxErrors() == 0 else None))
+                # Daqui em diante só o AST é usado; a árvore do ANTLR e os tokens podem ser liberados
+                del lexer, stream, parser, tree
+
+            analyzer = LAGrammarSemanticAnalyzer(error_listener)
+            if perfil is not None:
+                perfil.instrumenta(analyzer)
+
+            with mede_fase(estatisticas, 'walk', perfil):
+                if paralelo:
+                    # Também o corpo dos subprogramas é verificado em paralelo
+                    analisa_duas_passadas(analyzer, ast, paralelo)
+                else:
+                    arvore.Percurso().percorre(analyzer, ast)
+
+    with mede_fase(estatisticas, 'saida', perfil):
+        error_listener.print_errors(output_file)
+
+        if cache is not None:
+            with open(output_file, 'rb') as f:
+                resultados.grava(chave, f.read())
+
+    return completa_estatisticas(estatisticas, perfil)
+
+def completa_estatisticas(estatisticas, perfil):
+    # Chaves comuns a toda execução, inclusive as respondidas pelo cache
+    if perfil is not None:
+        estatisticas['perfil'] = perfil.json()
+    # Pico de memória do processo (ru_maxrss é em KB no Linux)
+    estatisticas['memoria_kb'] = resource.getrusage(resource.RUSAGE_SELF).ru_maxrss
+    return estatisticas
+
+def argumentos_cli():
+    parser = argparse.ArgumentParser(usage="Python3 main.py entrada.txt saida.txt [opções]")
+    parser.add_argument("entrada")
+    parser.add_argument("saida")
+    parser.add_argument("--sll", action="store_true",
+                        help="tenta primeiro a predição SLL e só usa LL completo se ela falhar")
+    parser.add_argument("--streaming", action="store_true",
+                        help="escreve os erros na saída conforme a análise avança")
+    parser.add_argument("--max-errors", type=int, default=None, metavar="N",
+                        help="escreve no máximo N erros e para a análise assim que eles estiverem decididos")
+    parser.add_argument("--fail-fast", action="store_true",
+                        help="o mesmo que --max-errors 1")
+    parser.add_argument("--cache", default=None, metavar="DIR",
+                        help="reaproveita resultados de códigos já analisados, guardados em DIR")
+    parser.add_argument("--cache-limite", type=int, default=LIMITE_PADRAO // (1024 * 1024), metavar="MB",
+                        help="tamanho máximo do cache em MB (padrão: %(default)s)")
+    parser.add_argument("--paralelo", type=int, default=None, metavar="N",
+                        help="analisa as declarações globais e o corpo dos subprogramas em N processos")
+    parser.add_argument("--memoria-limitada", action="store_true",
+                        help="analisa uma declaração global por vez, soltando cada uma ao terminar")
+    parser.add_argument("--lexer-rapido", action="store_true",
+                        help="gera os tokens com o lexer de expressão regular (lexico.py) em vez do LAGrammarLexer")
+    parser.add_argument("--sem-servidor", action="store_true",
+                        help="analisa neste processo mesmo que o servidor de análise esteja rodando")
+    parser.add_argument("--profile", nargs="?", const="-", default=None, metavar="ARQUIVO",
+                        help="grava em ARQUIVO (ou mostra, sem ARQUIVO) um perfil JSON da execução")
+    return parser
+
+def executa(argv):
+    # Execução pela linha de comando, também usada pelo servidor de análise
+    args = argumentos_cli().parse_args(argv)
+    estatisticas = main(args.entrada, args.saida, modo_rapido=args.sll,
+                        streaming=args.streaming, max_errors=args.max_errors,
+                        cache=args.cache, cache_limite=args.cache_limite * 1024 * 1024,
+                        perfil=args.profile is not None, paralelo=args.paralelo,
+                        fail_fast=args.fail_fast, memoria_limitada=args.memoria_limitada,
+                        lexer_rapido=args.lexer_rapido)
+    if args.sll:
+        print(f"{args.entrada}: {estatisticas['predicao']}")
+    if args.memoria_limitada:
+        print(f"{args.entrada}: pico de memória {estatisticas['memoria_kb'] / 1024:.1f} MB")
+    if args.profile == "-":
+        print(json.dumps(estatisticas.get('perfil'), indent=2))
+    elif args.profile is not None:
+        with open(args.profile, "w") as f:
+            json.dump(estatisticas.get('perfil'), f, indent=2)
 
 if __name__ == '__main__':
-    if len(sys.argv) != 3:
-        print("Uso: Python3 main.py entrada.txt saida.txt")
-        sys.exit(1)
-    
-    input_file = sys.argv[1]
-    output_file = sys.argv[2]
-    main(input_file, output_file)
+    executa(sys.argv[1:])
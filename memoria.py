@@ -0,0 +1,83 @@
+# Análise com memória limitada (--memoria-limitada): os tokens saem do lexer um a
+# um e são agrupados por declaração global; cada declaração é analisada
+# sintaticamente sozinha, entregue ao analisador semântico e descartada antes da
+# próxima. Só o corpo do algoritmo, a última unidade, é analisado inteiro.
+#
+# As fronteiras são as mesmas da análise paralela (paralelo.py), e sem erros de
+# sintaxe as árvores são as que a análise do arquivo inteiro produziria. Com um
+# erro de sintaxe a unidade é None, e o arquivo precisa ser analisado inteiro,
+# porque a recuperação de erros depende do que vem antes e depois do trecho.
+
+from antlr4 import CommonTokenStream, Token
+from antlr4.ListTokenSource import ListTokenSource
+from antlr4.atn.PredictionMode import PredictionMode
+from LAGrammarParser import LAGrammarParser
+from paralelo import INICIO_DECLARACAO, ABRE_SUBPROGRAMA, FECHA_SUBPROGRAMA, ALGORITMO
+from perfil import mede_fase
+
+def trechos(lexer):
+    # Gera (tokens, é o algoritmo) de cada declaração global e, por fim, do
+    # 'algoritmo' até o fim do arquivo, pedindo ao lexer só o necessário. Se o
+    # arquivo acabar sem 'algoritmo', o último item é None
+    atual = []
+    profundidade = 0
+    algoritmo = False
+    while True:
+        token = lexer.nextToken()
+        if token.type == Token.EOF:
+            break
+        inicio = False
+        if algoritmo:
+            pass
+        elif token.type in ABRE_SUBPROGRAMA:
+            inicio = profundidade == 0
+            profundidade += 1
+        elif token.type in FECHA_SUBPROGRAMA:
+            profundidade = max(profundidade - 1, 0)
+        elif profundidade == 0 and token.type in INICIO_DECLARACAO:
+            inicio = True
+        elif profundidade == 0 and token.type == ALGORITMO:
+            inicio = algoritmo = True
+        if inicio and atual:
+            yield atual, False
+            atual = []
+        atual.append(token)
+    yield (atual, True) if algoritmo else None
+
+def parse_trecho(tokens, algoritmo, modo_rapido):
+    # Retorna (árvore, tokens do trecho) ou None se houver erro de sintaxe ou sobrarem tokens
+    stream = CommonTokenStream(ListTokenSource(tokens))
+    parser = LAGrammarParser(stream)
+    parser.removeErrorListeners()
+    if modo_rapido:
+        parser._interp.predictionMode = PredictionMode.SLL
+    # O corpo do algoritmo é analisado como um programa sem declarações
+    arvore = parser.programa() if algoritmo else parser.declaracoes()
+    if parser.getNumberOfSyntaxErrors() > 0:
+        return None
+    if not algoritmo and parser.getCurrentToken().type != Token.EOF:
+        return None
+    return arvore, stream.tokens
+
+FIM = object()
+
+def unidades(lexer, estatisticas, modo_rapido=False, perfil=None):
+    # Gera (árvore, tokens) de cada unidade, na ordem do código, e para depois de
+    # gerar None no primeiro erro de sintaxe. Os tempos de lex e parse de todas as
+    # unidades se somam em `estatisticas`
+    gerador = trechos(lexer)
+    while True:
+        with mede_fase(estatisticas, 'lex', perfil):
+            trecho = next(gerador, FIM)
+        if trecho is FIM:
+            return
+        if trecho is None:
+            yield None
+            return
+        with mede_fase(estatisticas, 'parse', perfil):
+            unidade = parse_trecho(*trecho, modo_rapido)
+        del trecho  # Os tokens ficam só na unidade, que o analisador solta ao terminar
+        yield unidade
+        if unidade is None:
+            return
+        del unidade
@@ -0,0 +1,193 @@
+# Análise sintática paralela de arquivos grandes: os tokens são gerados uma vez,
+# divididos nas fronteiras das declarações globais e cada trecho é analisado num
+# processo separado. As árvores voltam serializadas e são remontadas na mesma
+# forma que a análise sequencial teria produzido, então o analisador semântico e
+# as linhas dos erros não mudam.
+
+from concurrent.futures import ProcessPoolExecutor
+from antlr4 import CommonTokenStream, TerminalNode
+from antlr4.Token import CommonToken
+from antlr4.ListTokenSource import ListTokenSource
+from antlr4.tree.Tree import ErrorNode, ErrorNodeImpl, TerminalNodeImpl
+from antlr4.atn.PredictionMode import PredictionMode
+from LAGrammarParser import LAGrammarParser
+
+def _tipo_token(texto):
+    return LAGrammarParser.literalNames.index(f"'{texto}'")
+
+INICIO_DECLARACAO = {_tipo_token(t) for t in ('declare', 'constante', 'tipo', 'funcao', 'procedimento')}
+ABRE_SUBPROGRAMA = {_tipo_token('funcao'), _tipo_token('procedimento')}
+FECHA_SUBPROGRAMA = {_tipo_token('fim_funcao'), _tipo_token('fim_procedimento')}
+ALGORITMO = _tipo_token('algoritmo')
+
+# Classe do contexto de cada regra, na ordem de LAGrammarParser.ruleNames
+CLASSES = [getattr(LAGrammarParser, nome[0].upper() + nome[1:] + 'Context') for nome in LAGrammarParser.ruleNames]
+
+# Abaixo disto o custo de iniciar os processos é maior que o ganho
+MINIMO_TOKENS = 2000
+
+def divide(tokens, partes):
+    # Retorna os intervalos [inicio, fim) de tokens de cada trecho de declarações
+    # e a posição do 'algoritmo', ou None se não for possível dividir
+    fronteiras = []
+    profundidade = 0
+    for i, token in enumerate(tokens):
+        if token.type in ABRE_SUBPROGRAMA:
+            if profundidade == 0:
+                fronteiras.append(i)
+            profundidade += 1
+        elif token.type in FECHA_SUBPROGRAMA:
+            profundidade = max(profundidade - 1, 0)
+        elif profundidade == 0 and token.type in INICIO_DECLARACAO:
+            fronteiras.append(i)
+        elif profundidade == 0 and token.type == ALGORITMO:
+            break
+    else:
+        return None
+    algoritmo = i
+    if not fronteiras:
+        return None
+
+    # O primeiro trecho começa sempre no token 0, para que qualquer coisa antes da
+    # primeira declaração cause erro de sintaxe no trecho e não seja descartada
+    fronteiras[0] = 0
+    tamanho = algoritmo / partes
+    intervalos = []
+    inicio = 0
+    for fronteira in fronteiras[1:]:
+        if fronteira - inicio >= tamanho:
+            intervalos.append((inicio, fronteira))
+            inicio = fronteira
+    intervalos.append((inicio, algoritmo))
+    return intervalos, algoritmo
+
+def dados_tokens(tokens):
+    # Campos de cada token que interessam ao parser e ao analisador, sem a
+    # referência ao lexer, para enviar a outro processo
+    return [(t.type, t.text, t.line, t.column, t.start, t.stop) for t in tokens]
+
+def cria_tokens(dados):
+    tokens = []
+    for tipo, texto, linha, coluna, inicio, fim in dados:
+        token = CommonToken(type=tipo, start=inicio, stop=fim)
+        token.text = texto
+        token.line = linha
+        token.column = coluna
+        token.tokenIndex = len(tokens)
+        tokens.append(token)
+    return tokens
+
+def serializa(arvore, base):
+    # Lista em pré-ordem, sem recursão: para regras, (regra, estado, início, fim, filhos);
+    # para folhas, o índice do token somado a `base`, ou (é nó de erro, token) quando
+    # for um nó de erro ou um token inventado pela recuperação de erros, que não
+    # está no fluxo de tokens
+    saida = []
+    pilha = [arvore]
+    while pilha:
+        no = pilha.pop()
+        if isinstance(no, TerminalNode):
+            token = no.symbol
+            if token.tokenIndex < 0:
+                saida.append((isinstance(no, ErrorNode), dados_tokens([token])[0]))
+            elif isinstance(no, ErrorNode):
+                saida.append((True, token.tokenIndex + base))
+            else:
+                saida.append(token.tokenIndex + base)
+        else:
+            filhos = no.children or []
+            fim = no.stop.tokenIndex + base if no.stop is not None else -1
+            saida.append((no.getRuleIndex(), no.invokingState, no.start.tokenIndex + base, fim, len(filhos)))
+            pilha.extend(reversed(filhos))
+    return saida
+
+def parse_trecho(args):
+    # Executado nos processos: analisa um trecho e devolve a árvore serializada,
+    # ou None se houver erro de sintaxe ou sobrarem tokens
+    dados, base, ultimo, modo_rapido = args
+    tokens = cria_tokens(dados)
+    parser = LAGrammarParser(CommonTokenStream(ListTokenSource(tokens)))
+    parser.removeErrorListeners()
+    if modo_rapido:
+        parser._interp.predictionMode = PredictionMode.SLL
+    # O corpo do algoritmo é analisado como um programa sem declarações
+    arvore = parser.programa() if ultimo else parser.declaracoes()
+    if parser.getNumberOfSyntaxErrors() > 0:
+        return None
+    if not ultimo and parser.getCurrentToken().type != CommonToken.EOF:
+        return None
+    return serializa(arvore, base)
+
+def reconstroi(parser, serializado, tokens):
+    raiz = None
+    pilha = []  # (contexto, filhos que ainda faltam)
+    for item in serializado:
+        if isinstance(item, int):
+            no = TerminalNodeImpl(tokens[item])
+            filhos = 0
+        elif len(item) == 2:
+            erro, token = item
+            if not isinstance(token, int):
+                token = cria_tokens([token])[0]
+                token.tokenIndex = -1
+            else:
+                token = tokens[token]
+            no = ErrorNodeImpl(token) if erro else TerminalNodeImpl(token)
+            filhos = 0
+        else:
+            regra, estado, inicio, fim, filhos = item
+            no = CLASSES[regra](parser, None, estado)
+            no.start = tokens[inicio]
+            no.stop = tokens[fim] if fim >= 0 else None
+        if pilha:
+            pai, restantes = pilha[-1]
+            no.parentCtx = pai
+            pai.addChild(no)
+            if restantes == 1:
+                pilha.pop()
+            else:
+                pilha[-1] = (pai, restantes - 1)
+        else:
+            raiz = no
+        if filhos:
+            pilha.append((no, filhos))
+    return raiz
+
+def parse_paralelo(parser, stream, workers, modo_rapido=False):
+    # Retorna a árvore do programa, ou None se o arquivo deve ser analisado de
+    # forma sequencial (pequeno, sem 'algoritmo' ou com erros de sintaxe, cuja
+    # recuperação depende do que vem antes e depois de cada trecho)
+    tokens = stream.tokens
+    if workers < 2 or len(tokens) < MINIMO_TOKENS:
+        return None
+    divisao = divide(tokens, workers)
+    if divisao is None:
+        return None
+    intervalos, algoritmo = divisao
+    # O último trecho vai do 'algoritmo' ao fim, sem o EOF, que o ListTokenSource recria
+    intervalos.append((algoritmo, len(tokens) - 1))
+
+    tarefas = []
+    for n, (inicio, fim) in enumerate(intervalos):
+        dados = dados_tokens(tokens[inicio:fim])
+        tarefas.append((dados, inicio, n == len(intervalos) - 1, modo_rapido))
+    with ProcessPoolExecutor(max_workers=min(workers, len(tarefas))) as executor:
+        trechos = list(executor.map(parse_trecho, tarefas))
+    if any(trecho is None for trecho in trechos):
+        return None
+
+    # Junta as declarações de todos os trechos no nó declaracoes do programa
+    programa = reconstroi(parser, trechos[-1], tokens)
+    declaracoes = programa.declaracoes()
+    declaracoes.children = None
+    for trecho in trechos[:-1]:
+        for decl in reconstroi(parser, trecho, tokens).children or []:
+            decl.parentCtx = declaracoes
+            declaracoes.addChild(decl)
+    if declaracoes.children:
+        declaracoes.start = declaracoes.children[0].start
+        declaracoes.stop = declaracoes.children[-1].stop
+    else:
+        declaracoes.stop = tokens[algoritmo - 1] if algoritmo > 0 else None
+    programa.start = tokens[0]
+    return programa
@@ -0,0 +1,85 @@
+# Perfil de execução do analisador (--profile): tempo e blocos alocados de cada
+# fase, chamadas e tempo acumulado de cada método do analisador semântico e
+# quantidade de nós da árvore por regra. Tudo é serializável em JSON.
+
+import sys
+import time
+from contextlib import contextmanager
+from antlr4.tree.Tree import ErrorNode, TerminalNode
+
+@contextmanager
+def mede_fase(estatisticas, nome, perfil=None):
+    # Soma o tempo da fase em estatisticas[nome]; com perfil, também os blocos alocados.
+    # Uma fase pode ser medida em vários pedaços (como no modo de memória limitada)
+    blocos = sys.getallocatedblocks() if perfil is not None else 0
+    inicio = time.perf_counter()
+    try:
+        yield
+    finally:
+        tempo = time.perf_counter() - inicio
+        estatisticas[nome] = estatisticas.get(nome, 0.0) + tempo
+        if perfil is not None:
+            fase = perfil.fases.setdefault(nome, {'tempo': 0.0, 'blocos_alocados': 0})
+            fase['tempo'] += tempo
+            fase['blocos_alocados'] += sys.getallocatedblocks() - blocos
+
+class Perfil:
+    def __init__(self):
+        self.fases = {}
+        self.metodos = {}
+        self.nos = {}
+
+    def instrumenta(self, analyzer):
+        # Troca, só nesta instância, cada método do analisador por uma versão que
+        # conta chamadas e tempo; sem --profile nada disso é feito
+        for nome, funcao in vars(type(analyzer)).items():
+            if not nome.startswith('__') and callable(funcao):
+                setattr(analyzer, nome, self.envolve(nome, getattr(analyzer, nome)))
+
+    def envolve(self, nome, metodo):
+        estatistica = self.metodos.setdefault(nome, {'chamadas': 0, 'tempo': 0.0})
+        profundidade = [0]
+
+        def envolvido(*args, **kwargs):
+            estatistica['chamadas'] += 1
+            profundidade[0] += 1
+            inicio = time.perf_counter()
+            try:
+                return metodo(*args, **kwargs)
+            finally:
+                profundidade[0] -= 1
+                # Em chamadas recursivas (get_tipo_expressao) só a mais externa soma tempo
+                if profundidade[0] == 0:
+                    estatistica['tempo'] += time.perf_counter() - inicio
+        return envolvido
+
+    def conta_nos(self, tree):
+        pilha = [tree]
+        while pilha:
+            no = pilha.pop()
+            if isinstance(no, ErrorNode):
+                regra = 'erro'
+            elif isinstance(no, TerminalNode):
+                regra = 'terminal'
+            else:
+                regra = no.parser.ruleNames[no.getRuleIndex()]
+                if no.children:
+                    pilha.extend(no.children)
+            self.nos[regra] = self.nos.get(regra, 0) + 1
+
+    def json(self):
+        return {'fases': self.fases, 'metodos': self.metodos, 'nos': self.nos}
+
+def agrega(perfis):
+    # Soma os perfis de vários arquivos (modo em lote do teste.py)
+    total = {'arquivos': 0, 'fases': {}, 'metodos': {}, 'nos': {}}
+    for perfil in perfis:
+        total['arquivos'] += 1
+        for secao in ('fases', 'metodos'):
+            for nome, valores in perfil[secao].items():
+                soma = total[secao].setdefault(nome, dict.fromkeys(valores, 0))
+                for chave, valor in valores.items():
+                    soma[chave] += valor
+        for regra, quantidade in perfil['nos'].items():
+            total['nos'][regra] = total['nos'].get(regra, 0) + quantidade
+    return total
@@ -0,0 +1,102 @@
+# Servidor de análise residente: mantém o ANTLR importado, os ATNs do lexer e do
+# parser desserializados e os caches de DFA preenchidos entre uma execução e outra.
+# Enquanto ele estiver rodando, `python3 main.py entrada.txt saida.txt` manda a
+# análise para cá pelo socket Unix em vez de fazer tudo do zero.
+
+import argparse
+import io
+import json
+import os
+import signal
+import socketserver
+import sys
+import tempfile
+import time
+from contextlib import redirect_stdout
+
+import main as analisador
+from benchmark import GeradorLA, CASOS
+from cache import versao_analisador
+from cliente import socket_padrao
+from teste import lista_entradas
+
+class ServidorAnalise(socketserver.ForkingMixIn, socketserver.UnixStreamServer):
+    # Cada pedido é atendido num processo filho, criado por fork: ele herda o ANTLR
+    # importado e os DFAs preenchidos pelo aquecimento, e uma análise demorada não
+    # deixa os outros clientes esperando. O chdir de cada pedido fica no filho, mas
+    # também os DFAs que ele aprende: o servidor só conhece o que o aquecimento ensinou.
+    # (Atender no próprio processo não é uma opção: o runtime do ANTLR e o
+    # redirect_stdout não são seguros entre threads.)
+    pass
+
+class Tratador(socketserver.StreamRequestHandler):
+    def handle(self):
+        pedido = json.loads(self.rfile.readline())
+        inicio = time.perf_counter()
+        if pedido['versao'] != versao_analisador():
+            # O analisador mudou no disco depois que o servidor subiu
+            resposta = {'ok': False, 'motivo': 'versao'}
+        else:
+            saida = io.StringIO()
+            try:
+                os.chdir(pedido['cwd'])
+                with redirect_stdout(saida):
+                    analisador.executa(pedido['argv'])
+                resposta = {'ok': True, 'stdout': saida.getvalue()}
+            except (Exception, SystemExit) as e:
+                # O cliente refaz a análise no próprio processo e mostra o erro
+                resposta = {'ok': False, 'motivo': repr(e)}
+        self.wfile.write((json.dumps(resposta) + '\n').encode())
+        print(f"{' '.join(pedido['argv'])}: {'ok' if resposta['ok'] else resposta['motivo']} "
+              f"({time.perf_counter() - inicio:.3f}s)", file=sys.stderr)
+
+def aquece(caminhos=()):
+    # Preenche os caches de DFA antes do fork, já que o que cada filho aprende morre com
+    # ele: analisa, com predição LL e com SLL/LL, os programas sintéticos de todos os
+    # casos do benchmark (com e sem subprogramas) e os arquivos de `caminhos`
+    with tempfile.TemporaryDirectory() as diretorio:
+        saida = os.path.join(diretorio, 'saida.txt')
+        entradas = []
+        for caso, parametros in CASOS.items():
+            for subprogramas in (False, True):
+                entrada = os.path.join(diretorio, f"{caso}_{subprogramas}.txt")
+                with open(entrada, 'w') as f:
+                    f.write(GeradorLA(seed=0, subprogramas=subprogramas, **parametros).programa(300))
+                entradas.append(entrada)
+        entradas += lista_entradas(caminhos)
+        for entrada in entradas:
+            for modo_rapido in (False, True):
+                try:
+                    analisador.main(entrada, saida, modo_rapido=modo_rapido)
+                except Exception as e:
+                    # Um arquivo que derruba o analisador só deixa de aquecer os caches
+                    print(f"aquecimento: {entrada}: {type(e).__name__}: {e}", file=sys.stderr)
+
+def main():
+    parser = argparse.ArgumentParser(description="Servidor de análise residente para o main.py")
+    parser.add_argument("--socket", default=socket_padrao(),
+                        help="caminho do socket Unix (padrão: %(default)s)")
+    parser.add_argument("--aquecer", nargs="+", default=[], metavar="CAMINHO",
+                        help="pastas ou arquivos .txt analisados na subida, além dos programas sintéticos")
+    args = parser.parse_args()
+
+    versao_analisador()  # Calculada agora, com o código que de fato foi carregado
+    aquece(args.aquecer)
+    if os.path.exists(args.socket):
+        os.remove(args.socket)  # Socket de um servidor anterior que não foi encerrado
+    mascara = os.umask(0o177)  # Só o próprio usuário pode se conectar ao socket
+    servidor = ServidorAnalise(args.socket, Tratador)
+    os.umask(mascara)
+    # Encerrado com kill, o servidor também remove o socket
+    signal.signal(signal.SIGTERM, lambda *_: sys.exit(0))
+    with servidor:
+        print(f"Servidor de análise em {args.socket}", file=sys.stderr)
+        try:
+            servidor.serve_forever()
+        except KeyboardInterrupt:
+            pass
+        finally:
+            os.remove(args.socket)
+
+if __name__ == "__main__":
+    main()
@@ -0,0 +1,201 @@
+# Sessão de análise incremental para integração com editores: guarda o AST e o
+# resultado de cada declaração global e, depois de uma edição,
+# refaz a análise sintática só das declarações tocadas e a semântica só delas e
+# das declarações que consultam algum nome cuja declaração mudou
+
+import bisect
+from antlr4 import InputStream, CommonTokenStream, Token
+from LAGrammarLexer import LAGrammarLexer
+from LAGrammarParser import LAGrammarParser
+from main import SemanticErrorListener, LAGrammarSemanticAnalyzer, TextoNos
+import arvore
+from tabela_simbolos import TabelaSimbolos
+
+ABRE_CHAVE = LAGrammarParser.literalNames.index("'{'")
+
+class Unidade:
+    # Uma declaração global (decl_local_global) ou o corpo do algoritmo
+    __slots__ = ('inicio', 'linha', 'deslocamento', 'ast', 'erros', 'consultados', 'exportados')
+
+    def __init__(self, inicio, linha, ast):
+        self.inicio = inicio  # Posição (caractere) do código onde a unidade começa
+        self.linha = linha  # Linha dessa posição
+        self.deslocamento = 0  # Linhas inseridas/removidas antes da unidade desde a análise sintática
+        self.ast = ast  # AST da unidade (arvore.py)
+        self.erros = []  # (linha do token, msg); a linha real é esta + deslocamento
+        self.consultados = set()  # Nomes buscados na tabela de símbolos
+        self.exportados = []  # Símbolos declarados no escopo global
+
+def assinatura(simbolos):
+    # O que as declarações seguintes enxergam destes símbolos
+    return [(s.nome, s.categoria, s.tipo, tuple(s.parametros) if s.parametros is not None else None, s.valor)
+            for s in simbolos]
+
+class SessaoAnalise:
+    def __init__(self, codigo):
+        self.codigo = codigo
+        self.analisa_tudo()
+
+    def analisa_tudo(self):
+        lexer = LAGrammarLexer(InputStream(self.codigo))
+        stream = CommonTokenStream(lexer)
+        parser = LAGrammarParser(stream)
+        error_listener = SemanticErrorListener()
+        parser.removeErrorListeners()
+        parser.addErrorListener(error_listener)
+        tree = parser.programa()
+
+        if parser.getNumberOfSyntaxErrors() > 0:
+            # Com erros de sintaxe a árvore depende da recuperação do parser, então
+            # a sessão repete a análise completa a cada edição, como o main()
+            self.unidades = None
+            arvore.Percurso().percorre(LAGrammarSemanticAnalyzer(error_listener), arvore.baixa(tree, TextoNos()))
+            self.erros = error_listener.errors
+            return
+
+        self.unidades = self.cria_unidades(tree, TextoNos(stream.tokens), 0, True)
+        self.unidades[0].inicio = 0
+        self.unidades[0].linha = 1
+        self.reanalisa(0, len(self.unidades), [])
+
+    def cria_unidades(self, tree, texto, base, com_algoritmo):
+        declaracoes = tree.declaracoes() if com_algoritmo else tree
+        unidades = [Unidade(base + ctx.start.start, ctx.start.line, arvore.baixa(ctx, texto))
+                    for ctx in declaracoes.decl_local_global()]
+        if com_algoritmo:
+            algoritmo = tree.getChild(1).symbol
+            unidades.append(Unidade(base + algoritmo.start, algoritmo.line, arvore.baixa(tree.corpo(), texto)))
+        return unidades
+
+    def editar(self, inicio, fim, novo):
+        # Substitui codigo[inicio:fim] por `novo` e atualiza os diagnósticos
+        antigo = self.codigo
+        self.codigo = antigo[:inicio] + novo + antigo[fim:]
+        if self.unidades is None:
+            self.analisa_tudo()
+            return
+
+        delta = len(novo) - (fim - inicio)
+        delta_linhas = novo.count('\n') - antigo.count('\n', inicio, fim)
+
+        # Unidades tocadas pela edição; a anterior também entra porque um texto
+        # inserido logo no início de uma unidade pode se juntar ao último token dela
+        inicios = [u.inicio for u in self.unidades]
+        k = bisect.bisect_right(inicios, max(inicio - 1, 0)) - 1
+        m = bisect.bisect_right(inicios, fim) - 1
+
+        novas = 'estender'
+        while novas == 'estender':
+            ultima = m + 1 == len(self.unidades)
+            fim_regiao = len(self.codigo) if ultima else self.unidades[m + 1].inicio + delta
+            novas = self.parse_regiao(self.unidades[k], fim_regiao, ultima)
+            if novas == 'estender':
+                m += 1
+        if novas is None:
+            self.analisa_tudo()
+            return
+
+        for u in self.unidades[m + 1:]:
+            u.inicio += delta
+            u.linha += delta_linhas
+            u.deslocamento += delta_linhas
+
+        antigas = [s for u in self.unidades[k:m + 1] for s in u.exportados]
+        self.unidades[k:m + 1] = novas
+        if self.unidades and self.unidades[0].inicio != 0:
+            self.unidades[0].inicio = 0
+            self.unidades[0].linha = 1
+        self.reanalisa(k, k + len(novas), antigas)
+
+    def parse_regiao(self, primeira, fim, ultima):
+        # Analisa sintaticamente o código de primeira.inicio até fim. Retorna as novas
+        # unidades, 'estender' se a região precisa incluir a próxima unidade, ou None
+        # se não for possível garantir o mesmo resultado de uma análise completa
+        fatia = self.codigo[primeira.inicio:fim]
+        lexer = LAGrammarLexer(InputStream(fatia))
+        lexer.line = primeira.linha
+        lexer.column = primeira.inicio - (self.codigo.rfind('\n', 0, primeira.inicio) + 1)
+        stream = CommonTokenStream(lexer)
+        stream.fill()
+
+        if any(token.type == ABRE_CHAVE for token in stream.tokens):
+            return None  # Um '{' sem '}' na região pode virar comentário mais adiante no código
+        if not ultima and len(stream.tokens) > 1 and stream.tokens[-2].stop == len(fatia) - 1:
+            return 'estender'  # O último token encosta na próxima unidade e pode se juntar a ela
+
+        parser = LAGrammarParser(stream)
+        parser.removeErrorListeners()
+        tree = parser.programa() if ultima else parser.declaracoes()
+        if parser.getNumberOfSyntaxErrors() > 0 or parser.getCurrentToken().type != Token.EOF:
+            return None
+
+        novas = self.cria_unidades(tree, TextoNos(stream.tokens), primeira.inicio, ultima)
+        if novas:
+            novas[0].inicio = primeira.inicio
+            novas[0].linha = primeira.linha
+        return novas
+
+    def reanalisa(self, inicio, fim, antigas):
+        # Refaz a semântica das unidades [inicio, fim) e das que consultam nomes cuja
+        # declaração mudou; as demais só repõem seus símbolos na tabela. A tabela é
+        # montada de novo a cada edição, na ordem das unidades, porque cada unidade
+        # reanalisada só pode enxergar o que foi declarado antes dela: então toda edição
+        # custa uma inserção por símbolo global de todas as unidades (O(unidades)),
+        # mesmo que a análise sintática e a semântica fiquem só nas unidades afetadas
+        tabela = TabelaSimbolos()
+        alterados = set()
+        if inicio == fim and antigas:
+            alterados = {s.nome for s in antigas}
+        novas = []
+
+        for i, unidade in enumerate(self.unidades):
+            if inicio <= i < fim:
+                self.analisa_unidade(unidade, tabela)
+                novas.extend(unidade.exportados)
+                if i == fim - 1 and assinatura(novas) != assinatura(antigas):
+                    alterados |= {s.nome for s in antigas} | {s.nome for s in novas}
+            elif not unidade.consultados.isdisjoint(alterados):
+                anteriores = unidade.exportados
+                self.analisa_unidade(unidade, tabela)
+                if assinatura(unidade.exportados) != assinatura(anteriores):
+                    alterados |= {s.nome for s in anteriores} | {s.nome for s in unidade.exportados}
+            else:
+                for simbolo in unidade.exportados:
+                    tabela.declara(simbolo)
+
+    def analisa_unidade(self, unidade, tabela):
+        error_listener = SemanticErrorListener()
+        analyzer = LAGrammarSemanticAnalyzer(error_listener)
+        analyzer.tabela = tabela
+
+        globais = tabela.escopos[0]
+        declarados = len(globais)
+        tabela.consultas = set()
+        arvore.Percurso().percorre(analyzer, unidade.ast)
+        unidade.consultados = tabela.consultas
+        tabela.consultas = None
+
+        unidade.exportados = [tabela.visiveis[nome][-1] for nome in globais[declarados:]]
+        unidade.erros = error_listener.errors
+
+    def diagnosticos(self):
+        # Mesma lista (linha, msg) que o main() escreveria para o código atual
+        if self.unidades is None:
+            erros = list(self.erros)
+        else:
+            vistos = set()
+            erros = []
+            for unidade in self.unidades:
+                for line, msg in unidade.erros:
+                    erro = (line + unidade.deslocamento, msg)
+                    if erro not in vistos:
+                        vistos.add(erro)
+                        erros.append(erro)
+        erros.sort(key=lambda x: x[0])
+        return erros
+
+    def print_errors(self, output_file):
+        error_listener = SemanticErrorListener()
+        for line, msg in self.diagnosticos():
+            error_listener.add_error(line, msg)
+        error_listener.print_errors(output_file)
@@ -0,0 +1,91 @@
+# Tabela de símbolos do analisador semântico: pilha de escopos com busca em O(1)
+# e índice de campos de cada tipo registro para resolver caminhos como p.a.b
+
+import tipos
+
+VARIAVEL = 'variavel'
+CONSTANTE = 'constante'
+FUNCAO = 'funcao'
+PROCEDIMENTO = 'procedimento'
+TIPO = 'tipo'
+
+def caminho(nome):
+    # 'p.a.b[i]' -> ['p', 'a', 'b'] (a dimensão só aparece no fim do identificador)
+    return nome.split('[', 1)[0].split('.')
+
+class Simbolo:
+    __slots__ = ('nome', 'categoria', 'tipo', 'parametros', 'valor', 'nivel')
+
+    def __init__(self, nome, categoria, tipo=None, parametros=None, valor=None):
+        self.nome = nome
+        self.categoria = categoria
+        self.tipo = tipo  # tipos.Tipo; para funções, o tipo de retorno
+        self.parametros = parametros  # Lista de (nome, tipos.Tipo) para funções e procedimentos
+        self.valor = valor  # Texto do valor das constantes
+        self.nivel = 0  # Profundidade do escopo onde foi declarado
+
+class TabelaSimbolos:
+    def __init__(self):
+        # Cada nome aponta para a pilha de símbolos com esse nome; o último é o visível.
+        # Assim a busca não precisa percorrer os escopos um a um.
+        self.visiveis = {}
+        self.escopos = [[]]  # Nomes declarados em cada escopo aberto, do global ao atual
+        self.consultas = None  # Se for um set, guarda todo nome buscado (usado pela análise incremental)
+
+    def abre_escopo(self):
+        self.escopos.append([])
+
+    def fecha_escopo(self):
+        for nome in self.escopos.pop():
+            pilha = self.visiveis[nome]
+            pilha.pop()
+            if not pilha:
+                del self.visiveis[nome]
+
+    def declara(self, simbolo):
+        simbolo.nivel = len(self.escopos) - 1
+        self.visiveis.setdefault(simbolo.nome, []).append(simbolo)
+        self.escopos[-1].append(simbolo.nome)
+        return simbolo
+
+    def declara_registro(self, nome_tipo, campos):
+        # Índice dos campos do registro, usado por resolve() a cada segmento do caminho
+        tipo = tipos.registro(nome_tipo)
+        tipo.campos = {caminho(campo)[0]: tipo_campo for campo, tipo_campo in campos}
+        self.declara(Simbolo(nome_tipo, TIPO, tipo))
+
+    def busca(self, nome):
+        if self.consultas is not None:
+            self.consultas.add(nome)
+        pilha = self.visiveis.get(nome)
+        return pilha[-1] if pilha else None
+
+    def declarado_no_escopo(self, nome):
+        simbolo = self.busca(nome)
+        return simbolo is not None and simbolo.nivel == len(self.escopos) - 1
+
+    def __contains__(self, nome):
+        return self.busca(nome) is not None
+
+    def resolve(self, nome):
+        # Retorna (símbolo base, tipo final) de um caminho como p.a.b, ou None se
+        # a base não existir ou algum campo não pertencer ao registro anterior.
+        # Depois de um campo de um REGISTRO_ANONIMO o tipo final é None (desconhecido)
+        partes = caminho(nome)
+        simbolo = self.busca(partes[0])
+        if simbolo is None or (simbolo.categoria == TIPO and len(partes) > 1):
+            return None
+        tipo = simbolo.tipo
+        for campo in partes[1:]:
+            registro = tipos.deref(tipo)
+            if registro is tipos.REGISTRO_ANONIMO:
+                return simbolo, None
+            campos = registro.campos if registro is not None else None
+            if campos is None or campo not in campos:
+                return None
+            tipo = campos[campo]
+        return simbolo, tipo
+
+    def tipo(self, nome):
+        resolvido = self.resolve(nome)
+        return resolvido[1] if resolvido else None
@@ -1,28 +1,150 @@
+import argparse
+import json
 import os
-import subprocess
+import sys
+import time
+from concurrent.futures import ProcessPoolExecutor
 
-def run_trabalho(input_file, output_file):
-    # Chamando o programa trabalho1.py com a entrada especificada e salvando a saída em um arquivo
-    with open(output_file, 'w') as f:
-        subprocess.run(["python3", "main.py", input_file, output_file])
-def main():
-    input_folder = "entrada"
-    output_folder = "saida"
+import main as analisador
+from cache import LIMITE_PADRAO
+from perfil import agrega
+
+def run_trabalho(input_file, output_file, **opcoes):
+    # Executa o analisador no próprio processo, sem pagar a inicialização do
+    # interpretador e do ANTLR a cada arquivo
+    return analisador.main(input_file, output_file, **opcoes)
+
+def _run_trabalho(args):
+    input_file, output_file, opcoes = args
+    try:
+        return run_trabalho(input_file, output_file, **opcoes)
+    except Exception as e:
+        # Um arquivo que derruba o analisador não interrompe o lote: a falha vai
+        # para o resumo e os outros arquivos continuam
+        return {'arquivo': input_file, 'erro': f"{type(e).__name__}: {e}"}
 
+def lista_entradas(caminhos):
+    # Aceita tanto pastas (todos os .txt dentro delas) quanto arquivos avulsos
+    arquivos = []
+    for caminho in caminhos:
+        if os.path.isdir(caminho):
+            for nome in sorted(os.listdir(caminho)):
+                if nome.endswith(".txt"):
+                    arquivos.append(os.path.join(caminho, nome))
+        else:
+            arquivos.append(caminho)
+    return arquivos
+
+def run_lote(input_files, output_folder, workers=None, **opcoes):
     # Certifique-se de que a pasta de saída existe, se não, crie-a
     if not os.path.exists(output_folder):
         os.makedirs(output_folder)
 
-    input_files = os.listdir(input_folder)
+    tarefas = []
+    for input_path in input_files:
+        nome = os.path.splitext(os.path.basename(input_path))[0]
+        output_path = os.path.join(output_folder, nome + "_saida.txt")
+        tarefas.append((input_path, output_path, opcoes))
+
+    workers = workers or os.cpu_count() or 1
+    if workers == 1 or len(tarefas) <= 1:
+        return [_run_trabalho(tarefa) for tarefa in tarefas]
+
+    # Agrupa os arquivos em blocos para diminuir a comunicação entre processos
+    chunksize = max(1, len(tarefas) // (workers * 4))
+    with ProcessPoolExecutor(max_workers=workers) as executor:
+        return list(executor.map(_run_trabalho, tarefas, chunksize=chunksize))
+
+def falhas(tempos):
+    return [tempo for tempo in tempos if 'erro' in tempo]
+
+def resumo(tempos, total):
+    # Os arquivos em que o analisador falhou não têm tempos; só entram na contagem
+    quantidade = len(tempos)
+    falharam = len(falhas(tempos))
+    tempos = [tempo for tempo in tempos if 'erro' not in tempo]
+
+    # Soma os tempos de cada fase de todos os arquivos
+    fases = {'lex': 0.0, 'parse': 0.0, 'ast': 0.0, 'walk': 0.0}
+    for tempo in tempos:
+        for fase in fases:
+            fases[fase] += tempo[fase]
+
+    # Quantos arquivos foram resolvidos só com SLL e quantos precisaram de LL
+    predicoes = {}
+    for tempo in tempos:
+        predicoes[tempo['predicao']] = predicoes.get(tempo['predicao'], 0) + 1
+
+    # Acertos e faltas no cache, quando ele está ligado
+    cache = {'hit': 0, 'miss': 0}
+    for tempo in tempos:
+        if 'cache' in tempo:
+            cache[tempo['cache']] += 1
+
+    taxa = quantidade / total if total > 0 else 0.0
+    texto = (f"{quantidade} arquivos em {total:.3f}s ({taxa:.1f} arquivos/s) - "
+             f"lex {fases['lex']:.3f}s, parse {fases['parse']:.3f}s, ast {fases['ast']:.3f}s, walk {fases['walk']:.3f}s - "
+             f"SLL {predicoes.get('SLL', 0)}, LL {predicoes.get('LL', 0)}")
+    if cache['hit'] or cache['miss']:
+        texto += f" - cache {cache['hit']} hits, {cache['miss']} misses"
+    # Arquivos em que --max-errors/--fail-fast parou a análise antes do fim
+    interrompidos = sum(1 for tempo in tempos if tempo['interrompido'])
+    if interrompidos:
+        texto += f" - {interrompidos} interrompidos"
+    if falharam:
+        texto += f" - {falharam} falharam"
+    return texto
+
+def main():
+    parser = argparse.ArgumentParser(description="Executa o analisador em lote sobre os casos de teste")
+    parser.add_argument("entradas", nargs="*", default=["entrada"],
+                        help="pastas ou arquivos de entrada (padrão: entrada)")
+    parser.add_argument("-o", "--saida", default="saida",
+                        help="pasta onde os arquivos _saida.txt são gravados (padrão: saida)")
+    parser.add_argument("-j", "--workers", type=int, default=None,
+                        help="número de processos (padrão: número de núcleos)")
+    parser.add_argument("--sll", action="store_true",
+                        help="tenta primeiro a predição SLL e só usa LL completo se ela falhar")
+    parser.add_argument("--streaming", action="store_true",
+                        help="escreve os erros na saída conforme a análise avança")
+    parser.add_argument("--max-errors", type=int, default=None, metavar="N",
+                        help="escreve no máximo N erros por arquivo, parando a análise assim que eles estiverem decididos")
+    parser.add_argument("--fail-fast", action="store_true",
+                        help="o mesmo que --max-errors 1")
+    parser.add_argument("--cache", default=None, metavar="DIR",
+                        help="reaproveita resultados de códigos já analisados, guardados em DIR")
+    parser.add_argument("--cache-limite", type=int, default=LIMITE_PADRAO // (1024 * 1024), metavar="MB",
+                        help="tamanho máximo do cache em MB (padrão: %(default)s)")
+    parser.add_argument("--memoria-limitada", action="store_true",
+                        help="analisa uma declaração global por vez, soltando cada uma ao terminar")
+    parser.add_argument("--lexer-rapido", action="store_true",
+                        help="gera os tokens com o lexer de expressão regular (lexico.py)")
+    parser.add_argument("--profile", default=None, metavar="ARQUIVO",
+                        help="grava em ARQUIVO o perfil JSON somado de todos os arquivos")
+    args = parser.parse_args()
+
+    input_files = lista_entradas(args.entradas)
+
+    inicio = time.perf_counter()
+    tempos = run_lote(input_files, args.saida, args.workers, modo_rapido=args.sll,
+                      streaming=args.streaming, max_errors=args.max_errors,
+                      cache=args.cache, cache_limite=args.cache_limite * 1024 * 1024,
+                      perfil=args.profile is not None, fail_fast=args.fail_fast,
+                      memoria_limitada=args.memoria_limitada, lexer_rapido=args.lexer_rapido)
+    total = time.perf_counter() - inicio
+
+    print(resumo(tempos, total))
+    for falha in falhas(tempos):
+        print(f"  {falha['arquivo']}: {falha['erro']}")
 
-    # Iterando sobre os arquivos de entrada
-    for input_file in input_files:
-        if input_file.endswith(".txt"):
-            input_path = os.path.join(input_folder, input_file)
-            output_path = os.path.join(output_folder, os.path.splitext(input_file)[0] + "_saida.txt")
+    if args.profile is not None:
+        # Arquivos que vieram do cache entram só com a fase de saída (a cópia do
+        # resultado); os que falharam não têm perfil
+        with open(args.profile, "w") as f:
+            json.dump(agrega(tempo['perfil'] for tempo in tempos if 'perfil' in tempo), f, indent=2)
 
-            # Executando o programa trabalho1.py com os arquivos de entrada e saída especificados
-            run_trabalho(input_path, output_path)
+    if falhas(tempos):
+        sys.exit(1)
 
 if __name__ == "__main__":
     main()
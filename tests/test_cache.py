@@ -0,0 +1,26 @@
+# Cache em disco dos resultados: LRU e frequência da limpeza entre processos
+
+import os
+
+import cache
+from cache import CacheResultados
+
+def test_limpeza_contada_entre_processos(tmp_path, monkeypatch):
+    # Cada gravação usa um CacheResultados novo, como uma execução do main.py
+    # pela linha de comando; a contagem precisa sobreviver entre elas
+    limpezas = []
+    monkeypatch.setattr(CacheResultados, 'limpa', lambda self: limpezas.append(1))
+    for i in range(3 * cache.LIMPEZA_A_CADA):
+        CacheResultados(str(tmp_path)).grava(f'{i:064x}', b'saida')
+    assert len(limpezas) == 3
+
+def test_remove_usadas_ha_mais_tempo(tmp_path):
+    resultados = CacheResultados(str(tmp_path), limite=250)
+    for i, chave in enumerate(['a', 'b', 'c']):
+        resultados.grava(chave, b'x' * 100)
+        os.utime(resultados.caminho(chave), (i, i))
+    resultados.busca('a')  # 'a' passa a ser a usada mais recentemente
+    resultados.remove_antigos()
+    assert resultados.busca('b') is None
+    assert resultados.busca('a') == b'x' * 100
+    assert resultados.busca('c') == b'x' * 100
@@ -0,0 +1,39 @@
+# Cliente do servidor de análise: sem servidor utilizável, o main.py analisa localmente
+
+import socket
+import threading
+
+import cliente
+
+def test_sem_servidor(tmp_path):
+    assert cliente.analisa_no_servidor(['entrada.txt', 'saida.txt'], str(tmp_path / 'nada.sock')) is False
+
+def test_servidor_que_nao_responde(tmp_path, monkeypatch):
+    monkeypatch.setattr(cliente, 'TEMPO_RESPOSTA', 0.2)
+    caminho = str(tmp_path / 'travado.sock')
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as servidor:
+        servidor.bind(caminho)
+        servidor.listen()
+        conexoes = []
+        aceita = threading.Thread(target=lambda: conexoes.append(servidor.accept()))
+        aceita.start()
+        assert cliente.analisa_no_servidor(['entrada.txt', 'saida.txt'], caminho) is False
+        aceita.join()
+        conexoes[0][0].close()
+
+def test_resposta_do_servidor(tmp_path, capsys):
+    caminho = str(tmp_path / 'servidor.sock')
+    with socket.socket(socket.AF_UNIX, socket.SOCK_STREAM) as servidor:
+        servidor.bind(caminho)
+        servidor.listen()
+
+        def responde():
+            conexao, _ = servidor.accept()
+            with conexao, conexao.makefile('rwb') as f:
+                f.readline()
+                f.write(b'{"ok": true, "stdout": "analisado\\n"}\n')
+        atende = threading.Thread(target=responde)
+        atende.start()
+        assert cliente.analisa_no_servidor(['entrada.txt', 'saida.txt'], caminho) is True
+        atende.join()
+    assert capsys.readouterr().out == "analisado\n"
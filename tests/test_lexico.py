@@ -0,0 +1,55 @@
+# O lexer de expressão regular (lexico.py) precisa gerar, token a token, o mesmo
+# que o LAGrammarLexer: tipo, texto, canal, posições, linha e coluna
+
+import pytest
+
+pytest.importorskip("LAGrammarLexer", reason="analisadores do ANTLR não gerados (antlr4 -Dlanguage=Python3 LAGrammar.g4)")
+
+from antlr4 import InputStream, Token
+from LAGrammarLexer import LAGrammarLexer
+from lexico import LexerRapido
+from benchmark import GeradorLA
+
+# Casos de fronteira das regras do lexer
+CASOS_LEXER = [
+    "",
+    "algoritmo fim_algoritmo",
+    "algoritmoX fim_algoritmo_ _x x_1 verdadeiro falso e ou eou",
+    "x<-1 y<=2 z<>3 w>=4 a<b c>d e=f -g",
+    "12 12.5 12. .5 1.2.3 007",
+    'escreva("cadeia", "com {chaves}", "")',
+    '"sem fim\nx <- 1',
+    "{ comentario\nem duas linhas } x { } {}{}",
+    "x <- 1 { sem fim\ny <- 2",
+    "@ # $ ! ~ % ç ação \\ '",
+    "a\r\nb\tc\n\n  d\r",
+    "p^.x <- &y[3] : ; , ( ) [ ] * / +",
+]
+
+def tokens_de(lexer):
+    # Campos de cada token que o parser e o analisador usam, até o EOF inclusive
+    tokens = []
+    while True:
+        t = lexer.nextToken()
+        tokens.append((t.type, t.text, t.channel, t.start, t.stop, t.line, t.column))
+        if t.type == Token.EOF:
+            return tokens
+
+def confere(texto):
+    assert tokens_de(LexerRapido(texto)) == tokens_de(LAGrammarLexer(InputStream(texto)))
+
+@pytest.mark.parametrize("texto", CASOS_LEXER)
+def test_casos_de_fronteira(texto):
+    confere(texto)
+
+@pytest.mark.parametrize("linhas", [100, 1000])
+@pytest.mark.parametrize("quebrado", [False, True])
+@pytest.mark.parametrize("subprogramas", [False, True])
+def test_programas_gerados(linhas, quebrado, subprogramas):
+    confere(GeradorLA(seed=linhas, quebrado=quebrado, subprogramas=subprogramas).programa(linhas))
+
+def test_eof_repetido():
+    # Depois do fim, os dois lexers continuam devolvendo o mesmo EOF
+    rapido, antlr = LexerRapido("x\n"), LAGrammarLexer(InputStream("x\n"))
+    assert tokens_de(rapido) == tokens_de(antlr)
+    assert tokens_de(rapido) == tokens_de(antlr)
@@ -0,0 +1,28 @@
+# Modo em lote do teste.py: uma falha do analisador fica restrita ao próprio arquivo
+
+import pytest
+
+pytest.importorskip("LAGrammarParser", reason="analisadores do ANTLR não gerados (antlr4 -Dlanguage=Python3 LAGrammar.g4)")
+
+import teste
+
+def test_falha_de_um_arquivo_nao_para_o_lote(tmp_path, monkeypatch):
+    entradas = []
+    for nome in ('a', 'quebra', 'b'):
+        entrada = tmp_path / f'{nome}.txt'
+        entrada.write_text("algoritmo\nfim_algoritmo\n", encoding='utf-8')
+        entradas.append(str(entrada))
+
+    analisa = teste.analisador.main
+
+    def main(input_file, output_file, **opcoes):
+        if 'quebra' in input_file:
+            raise AttributeError("'NoneType' object has no attribute 'alvo'")
+        return analisa(input_file, output_file, **opcoes)
+    monkeypatch.setattr(teste.analisador, 'main', main)
+
+    tempos = teste.run_lote(entradas, str(tmp_path / 'saida'), workers=1)
+    assert [tempo.get('arquivo') for tempo in teste.falhas(tempos)] == [entradas[1]]
+    assert (tmp_path / 'saida' / 'b_saida.txt').exists()
+    texto = teste.resumo(tempos, 1.0)
+    assert texto.startswith("3 arquivos") and texto.endswith("1 falharam")
@@ -0,0 +1,84 @@
+# Análise de arquivos inteiros pelo main(), como o teste.py faz em lote
+
+import pytest
+
+pytest.importorskip("LAGrammarParser", reason="analisadores do ANTLR não gerados (antlr4 -Dlanguage=Python3 LAGrammar.g4)")
+
+import main
+
+def analisa(tmp_path, codigo, **opcoes):
+    entrada = tmp_path / 'entrada.txt'
+    saida = tmp_path / 'saida.txt'
+    entrada.write_text(codigo, encoding='utf-8')
+    estatisticas = main.main(str(entrada), str(saida), **opcoes)
+    return saida.read_text(encoding='utf-8'), estatisticas
+
+@pytest.mark.parametrize("codigo", ["declare 1", "declare 1\nalgoritmo\nfim_algoritmo", "algoritmo\n1\nfim_algoritmo"])
+def test_regra_sem_tokens_consumidos(tmp_path, codigo):
+    # Declarações e comandos que não consomem nenhum token ficam sem ctx.stop
+    saida, _ = analisa(tmp_path, codigo)
+    assert saida.endswith("Fim da compilacao\n")
+
+# Só erros semânticos: com limite, os erros de sintaxe também contam (ver abaixo)
+PROGRAMA_COM_ERROS = """declare x: inteiro
+declare x: real
+algoritmo
+  y <- 1
+  x <- 2
+  z.campo <- 3
+  w <- 4
+fim_algoritmo
+"""
+
+def linhas_de_erro(saida):
+    return [linha for linha in saida.splitlines() if linha.startswith("Linha")]
+
+@pytest.mark.parametrize("opcoes", [{}, {'modo_rapido': True}, {'streaming': True}, {'lexer_rapido': True}])
+def test_limite_de_erros_igual_a_analise_completa(tmp_path, opcoes):
+    completa, _ = analisa(tmp_path, PROGRAMA_COM_ERROS, **opcoes)
+    erros = linhas_de_erro(completa)
+    assert len(erros) >= 2
+    for limite in range(1, len(erros) + 1):
+        limitada, _ = analisa(tmp_path, PROGRAMA_COM_ERROS, max_errors=limite, **opcoes)
+        assert linhas_de_erro(limitada) == erros[:limite]
+
+def test_fail_fast_igual_a_um_erro(tmp_path):
+    completa, _ = analisa(tmp_path, PROGRAMA_COM_ERROS)
+    primeiro, _ = analisa(tmp_path, PROGRAMA_COM_ERROS, max_errors=1)
+    rapido, estatisticas = analisa(tmp_path, PROGRAMA_COM_ERROS, fail_fast=True)
+    assert rapido == primeiro
+    assert linhas_de_erro(rapido) == linhas_de_erro(completa)[:1]
+    assert estatisticas['interrompido']
+
+PROGRAMA_SO_SINTAXE = """declare x: inteiro
+algoritmo
+  x <- 1 )
+  x <- 2 )
+  x <- 3 )
+fim_algoritmo
+"""
+
+def test_erros_de_sintaxe_fora_da_analise_completa(tmp_path):
+    saida, _ = analisa(tmp_path, PROGRAMA_SO_SINTAXE)
+    assert saida == "Fim da compilacao\n"
+
+@pytest.mark.parametrize("opcoes", [{}, {'modo_rapido': True}, {'streaming': True}, {'memoria_limitada': True}])
+def test_erros_de_sintaxe_contam_para_o_limite(tmp_path, opcoes):
+    rapido, estatisticas = analisa(tmp_path, PROGRAMA_SO_SINTAXE, fail_fast=True, **opcoes)
+    erros = linhas_de_erro(rapido)
+    assert len(erros) == 1
+    assert erros == ["Linha 3: erro sintatico proximo a )"]
+    assert rapido.endswith("Fim da compilacao\n")
+    assert estatisticas['interrompido']
+
+    dois, _ = analisa(tmp_path, PROGRAMA_SO_SINTAXE, max_errors=2, **opcoes)
+    assert linhas_de_erro(dois) == ["Linha 3: erro sintatico proximo a )", "Linha 4: erro sintatico proximo a )"]
+
+@pytest.mark.parametrize("opcoes", [{}, {'memoria_limitada': True}, {'perfil': True}])
+def test_estatisticas_do_cache_iguais_as_da_analise(tmp_path, opcoes):
+    cache = str(tmp_path / 'cache')
+    saida, analisada = analisa(tmp_path, PROGRAMA_COM_ERROS, cache=cache, **opcoes)
+    repetida, copiada = analisa(tmp_path, PROGRAMA_COM_ERROS, cache=cache, **opcoes)
+    assert (analisada['cache'], copiada['cache']) == ('miss', 'hit')
+    assert repetida == saida
+    assert set(analisada) <= set(copiada)
@@ -0,0 +1,72 @@
+# Sessão incremental: depois de cada edição, os diagnósticos são os mesmos que o
+# main() escreve para o código inteiro
+
+import pytest
+
+pytest.importorskip("LAGrammarParser", reason="analisadores do ANTLR não gerados (antlr4 -Dlanguage=Python3 LAGrammar.g4)")
+
+import main
+from sessao import SessaoAnalise
+
+PROGRAMA = """declare x: inteiro
+declare y: real
+constante c: inteiro = 3
+declare z: logico
+algoritmo
+  x <- c
+  y <- w
+  z <- x
+fim_algoritmo
+"""
+
+def saida_do_main(tmp_path, codigo):
+    entrada = tmp_path / 'entrada.txt'
+    saida = tmp_path / 'saida.txt'
+    entrada.write_text(codigo, encoding='utf-8')
+    main.main(str(entrada), str(saida))
+    return saida.read_text(encoding='utf-8')
+
+def confere(tmp_path, sessao):
+    esperada = saida_do_main(tmp_path, sessao.codigo)
+    linhas = [f"Linha {line}: {msg}\n" for line, msg in sessao.diagnosticos()]
+    assert "".join(linhas) + "Fim da compilacao\n" == esperada
+    sessao.print_errors(str(tmp_path / 'sessao.txt'))
+    assert (tmp_path / 'sessao.txt').read_text(encoding='utf-8') == esperada
+
+def edita(sessao, trecho, novo):
+    inicio = sessao.codigo.index(trecho)
+    sessao.editar(inicio, inicio + len(trecho), novo)
+
+def test_sessao_sem_edicoes(tmp_path):
+    confere(tmp_path, SessaoAnalise(PROGRAMA))
+
+def test_edicao_dentro_de_declaracao(tmp_path):
+    sessao = SessaoAnalise(PROGRAMA)
+    edita(sessao, "x: inteiro", "x: literal")
+    confere(tmp_path, sessao)
+    edita(sessao, "y: real", "w: real")
+    confere(tmp_path, sessao)
+
+def test_edicao_no_corpo_do_algoritmo(tmp_path):
+    sessao = SessaoAnalise(PROGRAMA)
+    edita(sessao, "  y <- w\n", "  y <- w\n  k <- 1\n  x <- y\n")
+    confere(tmp_path, sessao)
+    edita(sessao, "  z <- x\n", "")
+    confere(tmp_path, sessao)
+
+def test_remocao_de_declaracao(tmp_path):
+    sessao = SessaoAnalise(PROGRAMA)
+    edita(sessao, "constante c: inteiro = 3\n", "")
+    confere(tmp_path, sessao)
+    edita(sessao, "declare x: inteiro\n", "")
+    confere(tmp_path, sessao)
+
+def test_edicoes_seguidas(tmp_path):
+    # As linhas das unidades depois de cada edição acompanham as linhas inseridas e removidas
+    sessao = SessaoAnalise(PROGRAMA)
+    edita(sessao, "declare y: real\n", "declare y: real\ndeclare y: inteiro\n\n")
+    confere(tmp_path, sessao)
+    edita(sessao, "declare z: logico\n", "")
+    confere(tmp_path, sessao)
+    edita(sessao, "  x <- c\n", "  x <- z\n")
+    confere(tmp_path, sessao)
@@ -0,0 +1,33 @@
+# Resolução de caminhos de campos de registro (p.a.b) na tabela de símbolos
+
+import tipos
+from tabela_simbolos import TabelaSimbolos, Simbolo, VARIAVEL
+
+def tabela_com_ponto():
+    tabela = TabelaSimbolos()
+    tabela.declara_registro('ponto', [('x', tipos.REAL), ('y', tipos.REAL)])
+    return tabela, tabela.busca('ponto').tipo
+
+def test_campo_de_registro_declarado():
+    tabela, ponto = tabela_com_ponto()
+    p = tabela.declara(Simbolo('p', VARIAVEL, ponto))
+    assert tabela.resolve('p.x') == (p, tipos.REAL)
+    assert tabela.resolve('p.z') is None
+
+def test_campo_atraves_de_ponteiro():
+    tabela, ponto = tabela_com_ponto()
+    tabela.declara(Simbolo('p', VARIAVEL, tipos.ponteiro(ponto)))
+    assert tabela.tipo('p.y') is tipos.REAL
+
+def test_registro_sem_campos_declarados_aceita_qualquer_campo():
+    # declare v: registro
+    tabela = TabelaSimbolos()
+    v = tabela.declara(Simbolo('v', VARIAVEL, tipos.primitivo('registro')))
+    assert tabela.resolve('v.campo') == (v, None)
+    assert tabela.resolve('v.a.b') == (v, None)
+    assert tabela.resolve('w.campo') is None
+
+def test_campo_de_tipo_primitivo_nao_existe():
+    tabela = TabelaSimbolos()
+    tabela.declara(Simbolo('i', VARIAVEL, tipos.INTEIRO))
+    assert tabela.resolve('i.campo') is None
@@ -0,0 +1,22 @@
+# Tipos únicos por identidade (hash-consing) e sua cópia entre processos
+
+import pickle
+
+import tipos
+
+def test_ponteiro_unico_por_alvo():
+    assert tipos.ponteiro(tipos.INTEIRO) is tipos.ponteiro(tipos.INTEIRO)
+    assert tipos.ponteiro(tipos.ponteiro(tipos.REAL)) is tipos.ponteiro(tipos.ponteiro(tipos.REAL))
+    assert tipos.ponteiro(tipos.INTEIRO) is not tipos.ponteiro(tipos.REAL)
+
+def test_ponteiro_para_registro_nao_fica_internado():
+    internados = len(tipos._internados)
+    registro = tipos.registro('no')
+    registro.campos = {'valor': tipos.INTEIRO}
+    registro.campos['proximo'] = tipos.ponteiro(registro)
+    assert tipos.ponteiro(registro) is registro.campos['proximo']
+    assert len(tipos._internados) == internados
+
+def test_copia_mantem_identidade():
+    assert pickle.loads(pickle.dumps(tipos.ponteiro(tipos.LOGICO))) is tipos.ponteiro(tipos.LOGICO)
+    assert pickle.loads(pickle.dumps(tipos.alias('t'))) is tipos.alias('t')
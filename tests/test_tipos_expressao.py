@@ -0,0 +1,85 @@
+# Tipagem das expressões: cada nó é tipado uma única vez, então o número de
+# chamadas de calcula_tipo_expressao cresce linearmente com o tamanho do programa,
+# mesmo quando as mesmas chamadas são verificadas de novo
+
+import pytest
+
+pytest.importorskip("LAGrammarParser", reason="analisadores do ANTLR não gerados (antlr4 -Dlanguage=Python3 LAGrammar.g4)")
+
+import arvore
+import tipos
+from main import LAGrammarSemanticAnalyzer, SemanticErrorListener
+from tabela_simbolos import Simbolo, FUNCAO
+
+def cadeia(operandos):
+    # 1 + 1 + ... + 1, associada à esquerda como o parser monta
+    no = arvore.Expressao(arvore.NUM_INT, 1)
+    for _ in range(operandos - 1):
+        no = arvore.Expressao(arvore.BINARIA, 1, operandos=(no, arvore.Expressao(arvore.NUM_INT, 1)))
+    return no
+
+def conta_chamadas(analyzer):
+    chamadas = [0]
+    calcula = analyzer.calcula_tipo_expressao
+
+    def contado(ctx):
+        chamadas[0] += 1
+        return calcula(ctx)
+    analyzer.calcula_tipo_expressao = contado
+    return chamadas
+
+def chamadas_aninhadas(niveis, operandos):
+    # f(f(...f(1 + ... + 1)... + 1 + ... + 1) + 1 + ... + 1): cada argumento é uma cadeia
+    # de operandos cujo primeiro é a chamada do nível de dentro, e cada chamada é
+    # um nó do AST dentro da chamada que a contém, como o Rebaixador monta
+    chamada = None
+    argumento = cadeia(operandos)
+    for _ in range(niveis):
+        no = arvore.ChamadaFuncao((chamada,) if chamada is not None else ())
+        no.nome = 'f'
+        no.linha = 1
+        no.argumentos = (argumento,)
+        chamada = no
+        argumento = arvore.Expressao(arvore.CHAMADA_FUNCAO, 1, 'f')
+        for _ in range(operandos - 1):
+            argumento = arvore.Expressao(arvore.BINARIA, 1, operandos=(argumento, arvore.Expressao(arvore.NUM_INT, 1)))
+    return arvore.Raiz((chamada,))
+
+def analisador_com_f():
+    analyzer = LAGrammarSemanticAnalyzer(SemanticErrorListener())
+    analyzer.tabela.declara(Simbolo('f', FUNCAO, tipos.INTEIRO, parametros=[('a', tipos.INTEIRO)]))
+    return analyzer
+
+def chamadas_do_ast(ast):
+    pilha = list(ast.filhos)
+    while pilha:
+        no = pilha.pop()
+        yield no
+        pilha.extend(no.filhos)
+
+@pytest.mark.parametrize("niveis", [10, 20, 40, 80])
+def test_percurso_tipa_cada_no_uma_vez(niveis):
+    operandos = 5
+    analyzer = analisador_com_f()
+    chamadas = conta_chamadas(analyzer)
+    ast = chamadas_aninhadas(niveis, operandos)
+    arvore.Percurso().percorre(analyzer, ast)
+    assert not analyzer.error_listener.errors
+    # Cada argumento tem 2 * operandos - 1 nós de expressão: o total cresce linearmente
+    assert chamadas[0] == niveis * (2 * operandos - 1)
+
+    # Verificações repetidas das mesmas chamadas reaproveitam os tipos já calculados
+    for _ in range(3):
+        for chamada in chamadas_do_ast(ast):
+            analyzer.enterChamada_funcao_cmd(chamada)
+    assert chamadas[0] == niveis * (2 * operandos - 1)
+
+def test_expressao_ja_tipada_nao_e_recalculada():
+    analyzer = LAGrammarSemanticAnalyzer(SemanticErrorListener())
+    chamadas = conta_chamadas(analyzer)
+    expressao = cadeia(100)
+    analyzer.get_tipo_expressao(expressao)
+    antes = chamadas[0]
+    for _ in range(10):
+        analyzer.get_tipo_expressao(expressao)
+    assert chamadas[0] == antes
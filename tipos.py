@@ -0,0 +1,98 @@
+# Tipos da linguagem LA representados por objetos únicos (hash-consing): cada tipo
+# distinto é criado uma só vez, então comparar tipos é comparar identidade
+
+PRIMITIVO = 'primitivo'
+PONTEIRO = 'ponteiro'
+REGISTRO = 'registro'
+ALIAS = 'alias'
+
+class Tipo:
+    __slots__ = ('categoria', 'nome', 'alvo', 'campos', 'canonico', 'ponteiro')
+
+    def __init__(self, categoria, nome, alvo=None):
+        self.categoria = categoria
+        self.nome = nome
+        self.alvo = alvo  # Tipo apontado (ponteiro) ou tipo de origem (alias)
+        self.campos = None  # {campo: Tipo} dos registros, preenchido na declaração
+        # Tipo usado nas comparações: o próprio tipo, ou o destino final de um alias
+        self.canonico = alvo.canonico if categoria == ALIAS and alvo is not None else self
+        self.ponteiro = None  # Tipo ^self, criado no primeiro uso por ponteiro()
+
+    def __reduce__(self):
+        # Copiado para outro processo (análise em paralelo), um tipo internado volta
+        # a ser o objeto único de lá, para que a comparação por identidade continue valendo
+        if self.categoria == REGISTRO:
+            return (_registro_copiado, (self.nome, self.campos))
+        if self.categoria == PONTEIRO:
+            return (ponteiro, (self.alvo,))
+        return (_interna, (self.categoria, self.nome, self.alvo))
+
+    def __repr__(self):
+        if self.categoria == PONTEIRO:
+            return '^' + repr(self.alvo)
+        return self.nome
+
+_internados = {}
+
+def _interna(categoria, nome, alvo=None):
+    chave = (categoria, nome, alvo)
+    tipo = _internados.get(chave)
+    if tipo is None:
+        tipo = _internados[chave] = Tipo(categoria, nome, alvo)
+    return tipo
+
+def primitivo(nome):
+    return _interna(PRIMITIVO, nome)
+
+def ponteiro(alvo):
+    # O ponteiro fica guardado no tipo apontado e não em _internados: como os
+    # registros não são internados, a tabela guardaria cada registro para sempre
+    if alvo.ponteiro is None:
+        alvo.ponteiro = Tipo(PONTEIRO, None, alvo)
+    return alvo.ponteiro
+
+def registro(nome):
+    # Registros são nominais: cada declaração é um tipo novo, mesmo que outro
+    # registro (de outro escopo ou de uma análise anterior) tenha o mesmo nome
+    return Tipo(REGISTRO, nome)
+
+def _registro_copiado(nome, campos):
+    tipo = registro(nome)
+    tipo.campos = campos
+    return tipo
+
+def alias(nome, alvo=None):
+    # Sem alvo, representa um nome de tipo que não foi declarado
+    return _interna(ALIAS, nome, alvo)
+
+INTEIRO = primitivo('inteiro')
+REAL = primitivo('real')
+LITERAL = primitivo('literal')
+LOGICO = primitivo('logico')
+ENDERECO = primitivo('endereco')
+# O tipo 'registro' escrito sem campos: a gramática não deixa declarar os campos
+# junto da variável, então qualquer campo é aceito, com tipo desconhecido
+REGISTRO_ANONIMO = primitivo('registro')
+
+# Marcadores usados pelo analisador quando não é possível determinar o tipo
+INDEFINIDO = primitivo('indefinido')
+TIPO_INDEFINIDO = primitivo('tipo_indefinido')
+DESCONHECIDO = primitivo('desconhecido')
+RETORNO_DESCONHECIDO = primitivo('tipo_de_retorno_desconhecido')
+PROCEDIMENTO = primitivo('procedimento')
+PONTEIRO_GENERICO = primitivo('ponteiro')
+
+# Pares (variável, expressão) compatíveis além dos tipos idênticos
+_COMPATIVEIS = frozenset({(REAL, INTEIRO), (INTEIRO, REAL)})
+
+def compativel(tipo_var, tipo_expr):
+    tipo_var = tipo_var.canonico
+    tipo_expr = tipo_expr.canonico
+    return tipo_var is tipo_expr or (tipo_var, tipo_expr) in _COMPATIVEIS
+
+def deref(tipo):
+    # Segue ponteiros até o tipo apontado; os campos de um registro também
+    # são resolvidos através de um ponteiro para ele
+    while tipo is not None and tipo.canonico.categoria == PONTEIRO:
+        tipo = tipo.canonico.alvo
+    return tipo.canonico if tipo is not None else None